@@ -0,0 +1,99 @@
+"""benchmarks/compression.py"""
+
+# This script compares the CPU time and the size of the compressed
+# responses for the encodings and levels that are supported by the
+# CompressionMiddleware. The payload looks like the /products/all one.
+#
+# Usage: python -m benchmarks.compression [--products 2000] [--repeat 5]
+
+import argparse
+import json
+import time
+from typing import Callable
+
+from src.infrastructure.http.compression import (
+    _BrotliCompressor,
+    _Compressor,
+    _GzipCompressor,
+    _ZstdCompressor,
+    brotli,
+    zstandard,
+)
+
+# The encodings with the levels to compare
+LEVELS: dict[str, tuple[int, ...]] = {
+    "gzip": (1, 6, 9),
+    "br": (4, 11),
+    "zstd": (3, 19),
+}
+
+
+def payload(products: int) -> bytes:
+    return json.dumps(
+        {
+            "result": [
+                {
+                    "name": f"product-{index}",
+                    "title": f"The product number {index} in the catalogue",
+                    "price": 100 + index % 900,
+                    "amount": index % 50,
+                    "id": index,
+                    "version": 1 + index % 7,
+                }
+                for index in range(1, products + 1)
+            ],
+            "cursor": None,
+        }
+    ).encode()
+
+
+def compressors() -> dict[str, Callable[[int], _Compressor]]:
+    available: dict[str, Callable[[int], _Compressor]] = {
+        "gzip": _GzipCompressor
+    }
+    if brotli is not None:
+        available["br"] = _BrotliCompressor
+    if zstandard is not None:
+        available["zstd"] = _ZstdCompressor
+
+    return available
+
+
+def measure(
+    factory: Callable[[int], _Compressor], level: int, data: bytes, repeat: int
+) -> tuple[int, float]:
+    """Return the compressed size and the best time in milliseconds."""
+
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        compressor = factory(level)
+        size = len(compressor.compress(data) + compressor.finish())
+        best = min(best, time.perf_counter() - started)
+
+    return size, best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare the responses compression encodings"
+    )
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = payload(args.products)
+    print(f"payload: {len(data) / 1024:.1f} KB")
+
+    for encoding, factory in compressors().items():
+        for level in LEVELS[encoding]:
+            size, elapsed = measure(factory, level, data, args.repeat)
+            print(
+                f"{encoding:>4} {level:>2}: {size / 1024:7.1f} KB "
+                f"{elapsed:9.1f} ms  ratio {len(data) / size:5.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""benchmarks/statements.py"""
+
+# This script compares the cached repository statements with the ones
+# that are built per call on the /products/id/{id} path: the product
+# is read by its id, like ProductRepository.get does.
+# The statement building is measured alone and with the query execution
+# against a temporary SQLite database.
+#
+# Usage: python -m benchmarks.statements [--number 2000]
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Awaitable, Callable
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import undefer
+
+from src.domain.products import ProductRepository
+from src.infrastructure import database
+from src.infrastructure.database import ProductsTable
+from src.infrastructure.database.transaction import transaction
+
+
+def _per_call(function: Callable[[], object], number: int) -> float:
+    """Return the time of one call in microseconds."""
+
+    started = time.perf_counter()
+    for _ in range(number):
+        function()
+
+    return (time.perf_counter() - started) / number * 1_000_000
+
+
+async def _per_call_async(
+    function: Callable[[], Awaitable[object]], number: int
+) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        await function()
+
+    return (time.perf_counter() - started) / number * 1_000_000
+
+
+def build(number: int) -> tuple[float, float]:
+    """Build the statement with its cache key, the way SQLAlchemy does
+    before the execution, per call and from the cache."""
+
+    repository = ProductRepository.__new__(ProductRepository)
+
+    def uncached():
+        query = (
+            select(ProductsTable)
+            .where(ProductsTable.id == 1)
+            .options(repository._load())
+        )
+        query._generate_cache_key()
+
+    def cached():
+        query = repository._statement(
+            ("get", "id", None),
+            lambda: select(ProductsTable)
+            .where(ProductsTable.id == bindparam("where_key"))
+            .options(repository._load()),
+        )
+        query._generate_cache_key()
+
+    return _per_call(uncached, number), _per_call(cached, number)
+
+
+@transaction
+async def _prepare() -> int:
+    await database.create_tables()
+    product = await ProductRepository()._save(
+        {"name": "product", "title": "The product", "price": 1, "amount": 1}
+    )
+    return product.id
+
+
+@transaction
+async def execute(id_: int, number: int) -> tuple[float, float]:
+    """Read the product with the per call built and cached statements."""
+
+    repository = ProductRepository()
+
+    async def uncached():
+        # The loader options bypass the statements cache
+        await repository._get(key="id", value=id_, options=[undefer("*")])
+
+    async def cached():
+        await repository._get(key="id", value=id_)
+
+    # The first calls compile the SQL
+    await uncached()
+    await cached()
+
+    return (
+        await _per_call_async(uncached, number),
+        await _per_call_async(cached, number),
+    )
+
+
+async def _execute(number: int) -> tuple[float, float]:
+    try:
+        return await execute(await _prepare(), number)
+    finally:
+        await database.dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare the cached and per call built statements"
+    )
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    uncached, cached = build(args.number)
+    print(f"build:   per call {uncached:8.1f} us, cached {cached:8.1f} us")
+
+    # The database file is created in the current working directory
+    os.chdir(tempfile.mkdtemp())
+    uncached, cached = asyncio.run(_execute(args.number))
+    print(f"execute: per call {uncached:8.1f} us, cached {cached:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,15 @@ from datetime import datetime, timedelta
 
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from pydantic import ValidationError
 
 from src.config import settings
 from src.domain.authentication import TokenPayload
-from src.domain.users import User, UsersRepository
+from src.domain.users import UserIdentity, UsersRepository
 from src.infrastructure.errors import AuthenticationError, AuthorizationError
 
 __all__ = (
+    "decode_access_token",
     "get_current_user",
     "create_access_token",
     "RoleRequired",
@@ -24,8 +24,12 @@ oauth2_oauth = OAuth2PasswordBearer(
 )
 
 
-async def get_current_user(token: str = Depends(oauth2_oauth)) -> User:
-    """Function return current user"""
+def decode_access_token(token: str) -> TokenPayload:
+    """Function validate access token & return its payload"""
+
+    # NOTE: The jose and its crypto backends are imported on the first use
+    #       since they are heavy and slow down the workers startup.
+    from jose import JWTError, jwt
 
     try:
         payload = jwt.decode(
@@ -40,7 +44,19 @@ async def get_current_user(token: str = Depends(oauth2_oauth)) -> User:
     except (JWTError, ValidationError):
         raise AuthenticationError  # pylint: disable=W0707
 
-    user = await UsersRepository().get(key_="id", value_=token_payload.sub)
+    return token_payload
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_oauth),
+) -> UserIdentity:
+    """Function return current user.
+    Only its id and role are loaded, the rest of the columns
+    should be requested by the handlers that need them."""
+
+    token_payload = decode_access_token(token)
+
+    user = await UsersRepository().get_identity(value_=token_payload.sub)
 
     return user
 
@@ -48,6 +64,8 @@ async def get_current_user(token: str = Depends(oauth2_oauth)) -> User:
 def create_access_token(data: dict) -> str:
     """function create & return access token"""
 
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(
         seconds=settings.authentication.access_token.ttl
@@ -67,7 +85,9 @@ class RoleRequired:
     def __init__(self, role: bool):
         self.is_manager = role
 
-    async def __call__(self, user: User = Depends(get_current_user)):
+    async def __call__(
+        self, user: UserIdentity = Depends(get_current_user)
+    ) -> UserIdentity:
         if user.is_manager != self.is_manager:
             raise AuthorizationError
 
@@ -0,0 +1,3 @@
+"""src/application/health/__init__.py"""
+
+from src.application.health.health import *  # noqa: F401, F403
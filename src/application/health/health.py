@@ -0,0 +1,160 @@
+"""src/application/health/health.py"""
+
+# This module includes the workers warmup and the health checks
+# that are used by the load balancers and the orchestrators.
+
+import asyncio
+import time
+from typing import Any, Awaitable
+from urllib.parse import urlparse
+
+from loguru import logger
+from sqlalchemy import text
+
+from src.config import settings
+from src.domain.orders import OrdersRepository
+from src.domain.products import ProductRepository
+from src.domain.users import UsersRepository
+from src.infrastructure.database import get_engine, pool_status, warmup_engine
+from src.infrastructure.database.single_flight import single_flight_stats
+from src.infrastructure.database.transaction import transaction
+from src.infrastructure.errors import NotFoundError
+from src.infrastructure.models import PublicModel
+
+__all__ = (
+    "HealthCheckPublic",
+    "ReadinessPublic",
+    "warmup",
+    "readiness",
+)
+
+# Default ports of the broker URL schemes
+_BROKER_PORTS = {"redis": 6379, "rediss": 6379, "amqp": 5672}
+
+
+class _State:
+    """The worker is ready only after the successful warmup."""
+
+    warm: bool = False
+    error: Exception | None = None
+
+
+class HealthCheckPublic(PublicModel):
+    name: str
+    ok: bool
+    duration: float = 0  # seconds
+    error: str | None = None
+
+
+class ReadinessPublic(PublicModel):
+    ready: bool
+    checks: list[HealthCheckPublic]
+    pool: dict[str, int]
+    single_flight: dict[str, dict[str, Any]]
+
+
+@transaction
+async def _run_hot_queries() -> None:
+    """Run the most frequent queries, so their compiled SQL is cached
+    by the engine before the first requests. The ids are not expected
+    to exist, only the statements shape matters."""
+
+    await ProductRepository().filtered(limit_=1)
+    async for _ in OrdersRepository().all_pending(value_=0, limit_=1):
+        pass
+
+    for call in (
+        ProductRepository().get_version(key_="id", value_=0),
+        ProductRepository().get(key_="id", value_=0),
+        UsersRepository().get(key_="id", value_=0),
+    ):
+        try:
+            await call
+        except NotFoundError:
+            pass
+
+
+async def warmup() -> None:
+    """Open the pool connections and compile the hot queries.
+    The worker is reported as ready only after it is done,
+    the failed warmup is retried until then."""
+
+    started = time.monotonic()
+    delay = settings.health.warmup_retry_delay
+
+    while True:
+        try:
+            await warmup_engine()
+            await _run_hot_queries()
+        except Exception as error:  # pylint: disable=W0718
+            _State.error = error
+            logger.error(f"Warmup is failed, retry in {delay:.1f}s: {error}")
+        else:
+            break
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, settings.health.warmup_max_retry_delay)
+
+    _State.warm, _State.error = True, None
+    logger.info(f"Warmup is done in {time.monotonic() - started:.3f}s")
+
+
+async def _check(name: str, check: Awaitable[None]) -> HealthCheckPublic:
+    started = time.monotonic()
+
+    try:
+        await asyncio.wait_for(check, timeout=settings.health.timeout)
+    except Exception as error:  # pylint: disable=W0718
+        return HealthCheckPublic(
+            name=name,
+            ok=False,
+            duration=time.monotonic() - started,
+            error=repr(error),
+        )
+
+    return HealthCheckPublic(
+        name=name, ok=True, duration=time.monotonic() - started
+    )
+
+
+async def _warm() -> None:
+    if _State.error is not None:
+        raise RuntimeError(f"The warmup is failed: {_State.error!r}")
+    if not _State.warm:
+        raise RuntimeError("The warmup is not finished")
+
+
+async def _database() -> None:
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _broker() -> None:
+    """Check that the broker accepts the connections."""
+
+    url = urlparse(settings.broker.url)
+    _, writer = await asyncio.open_connection(
+        url.hostname or "localhost",
+        url.port or _BROKER_PORTS.get(url.scheme, 6379),
+    )
+    writer.close()
+    await writer.wait_closed()
+
+
+async def readiness() -> ReadinessPublic:
+    """Run all the checks concurrently."""
+
+    checks = {"warmup": _warm(), "database": _database()}
+    if settings.health.check_broker:
+        checks["broker"] = _broker()
+
+    results = await asyncio.gather(
+        *(_check(name, check) for name, check in checks.items())
+    )
+
+    return ReadinessPublic(
+        ready=all(result.ok for result in results),
+        checks=results,
+        pool=pool_status(),
+        single_flight=single_flight_stats(),
+    )
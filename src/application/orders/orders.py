@@ -1,7 +1,17 @@
 """src/application/orders.py"""
 
-from src.domain.orders import Order, OrdersRepository, OrderUncommited
-from src.domain.users import User
+from datetime import datetime, timedelta
+
+from loguru import logger
+
+from src.domain.orders import (
+    Order,
+    OrderPublic,
+    OrdersRepository,
+    OrderUncommited,
+)
+from src.domain.users import User, UserPublic
+from src.infrastructure.database.outbox import OutboxRepository
 from src.infrastructure.database.transaction import transaction
 
 
@@ -12,3 +22,75 @@ async def create(payload: dict, user: User) -> Order:
     order = await OrdersRepository().create(OrderUncommited(**payload))
 
     return order
+
+
+ORDERS_EMAIL_TOPIC = "orders.email"
+
+
+async def notify(
+    user: UserPublic, subject: str, orders: list[OrderPublic]
+) -> None:
+    """Schedule the orders email. It is saved within the current
+    transaction and sent by the outbox relay after the commit."""
+
+    OutboxRepository().add(
+        topic_=ORDERS_EMAIL_TOPIC,
+        payload_={
+            "user_": user,
+            "subject_": subject,
+            "orders_": orders,
+        },
+    )
+
+
+@transaction
+async def expire_pending_batch(
+    before: datetime, batch_size: int
+) -> tuple[int, int]:
+    return await OrdersRepository().expire_pending(
+        before_=before, limit_=batch_size
+    )
+
+
+async def expire_pending(max_age: int, batch_size: int) -> int:
+    """Cancel the pending orders that are older than max_age seconds.
+    Every batch is committed separately to avoid long write locks."""
+
+    before = datetime.utcnow() - timedelta(seconds=max_age)
+    total = 0
+
+    # NOTE: The batch may be smaller than the found orders since some
+    #       of them are paid concurrently, so it runs until nothing
+    #       is found instead of stopping on the short batch
+    while True:
+        found, expired = await expire_pending_batch(before, batch_size)
+        total += expired
+
+        if not found:
+            break
+
+    logger.info(f"Expired pending orders: {total}")
+
+    return total
+
+
+@transaction
+async def archive_batch(before: datetime, batch_size: int) -> int:
+    return await OrdersRepository().archive(before_=before, limit_=batch_size)
+
+
+async def archive(max_age: int, batch_size: int) -> int:
+    """Move the finished orders that are older than max_age seconds
+    to the archive. Every batch is committed separately."""
+
+    before = datetime.utcnow() - timedelta(seconds=max_age)
+    total = 0
+
+    # NOTE: It runs until nothing is found, the short batch does not mean
+    #       that there are no more orders to archive
+    while archived := await archive_batch(before, batch_size):
+        total += archived
+
+    logger.info(f"Archived orders: {total}")
+
+    return total
@@ -0,0 +1,3 @@
+"""src/application/rate_limiting/__init__.py"""
+
+from src.application.rate_limiting.dependency_injection import *  # noqa: F401, F403, E501
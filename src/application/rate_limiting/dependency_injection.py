@@ -0,0 +1,54 @@
+"""src/application/rate_limiting/dependency_injection.py"""
+
+import math
+
+from fastapi import Request
+from fastapi.security.utils import get_authorization_scheme_param
+
+from src.application.authentication import decode_access_token
+from src.config import LimitSettings, settings
+from src.infrastructure.errors import AuthenticationError, TooManyRequestsError
+from src.infrastructure.rate_limiting import get_rate_limit_backend
+
+__all__ = ("RateLimit",)
+
+
+class RateLimit:
+    """Limit the requests rate of the route using the token bucket.
+    Authenticated users are limited by their id, others by the IP.
+
+    Usage: @router.post(..., dependencies=[Depends(RateLimit(...))])
+    """
+
+    def __init__(self, scope: str, limit: LimitSettings):
+        self.scope = scope
+        self.limit = limit
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.rate_limit.enabled:
+            return
+
+        key = f"{self.scope}:{self._identity(request)}"
+        retry_after = await get_rate_limit_backend().acquire(
+            key, rate=self.limit.rate, burst=self.limit.burst
+        )
+
+        if retry_after > 0:
+            raise TooManyRequestsError(retry_after=math.ceil(retry_after))
+
+    @staticmethod
+    def _identity(request: Request) -> str:
+        scheme, token = get_authorization_scheme_param(
+            request.headers.get("Authorization")
+        )
+
+        if token and scheme.lower() == "bearer":
+            try:
+                return f"user:{decode_access_token(token).sub}"
+            except AuthenticationError:
+                # The invalid token is rejected by the route itself
+                pass
+
+        host = request.client.host if request.client else "unknown"
+
+        return f"ip:{host}"
@@ -0,0 +1,3 @@
+"""src/application/unit_of_work/__init__.py"""
+
+from src.application.unit_of_work.unit_of_work import *  # noqa: F401, F403
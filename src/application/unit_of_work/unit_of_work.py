@@ -0,0 +1,52 @@
+"""src/application/unit_of_work/unit_of_work.py"""
+
+from functools import cached_property
+
+from src.domain.analytics import (
+    OrdersStatusCountsRepository,
+    SalesDailyRepository,
+)
+from src.domain.orders import OrdersRepository
+from src.domain.products import ProductRepository
+from src.domain.users import UsersRepository
+from src.infrastructure.database import CTX_SESSION
+
+__all__ = ("UnitOfWork", "get_unit_of_work")
+
+
+class UnitOfWork:
+    """The repositories of the request that share its database session.
+    Every repository is created once, on the first access.
+
+    Usage: uow: UnitOfWork = Depends(get_unit_of_work)
+    """
+
+    @cached_property
+    def users(self) -> UsersRepository:
+        return UsersRepository()
+
+    @cached_property
+    def products(self) -> ProductRepository:
+        return ProductRepository()
+
+    @cached_property
+    def orders(self) -> OrdersRepository:
+        return OrdersRepository()
+
+    @cached_property
+    def sales(self) -> SalesDailyRepository:
+        return SalesDailyRepository()
+
+    @cached_property
+    def status_counts(self) -> OrdersStatusCountsRepository:
+        return OrdersStatusCountsRepository()
+
+    async def flush(self) -> None:
+        """Send the pending changes to the database in one batch.
+        The transaction decorator flushes them on commit anyway."""
+
+        await CTX_SESSION.get().flush()
+
+
+async def get_unit_of_work() -> UnitOfWork:
+    return UnitOfWork()
@@ -1,17 +1,41 @@
 """src/tasks/tasks.py"""
 
+import asyncio
 import smtplib
 from email.message import EmailMessage
 
 from celery import Celery
-from src.config import SMTP_HOST, SMTP_PASS, SMTP_PORT, SMTP_USER
+from src.application import orders
+from src.config import SMTP_HOST, SMTP_PASS, SMTP_PORT, SMTP_USER, settings
 from src.domain.orders import OrderPublic
-from src.domain.users import User
+from src.domain.users import UserPublic
+from src.infrastructure.database import dispose_engine, idempotency
+from src.infrastructure.database.outbox import relay
 
-celery = Celery("tasks", broker="redis://localhost:6379")
+celery = Celery("tasks", broker=settings.broker.url)
 
+# Periodic tasks, run them with: celery -A src.celery.tasks beat
+celery.conf.beat_schedule = {
+    "expire-pending-orders": {
+        "task": "tasks.expire_pending_orders",
+        "schedule": settings.orders.expiration_interval,
+    },
+    "archive-orders": {
+        "task": "tasks.archive_orders",
+        "schedule": settings.orders.archive_interval,
+    },
+    "relay-outbox": {
+        "task": "tasks.relay_outbox",
+        "schedule": settings.outbox.relay_interval,
+    },
+    "cleanup-idempotency-keys": {
+        "task": "tasks.cleanup_idempotency_keys",
+        "schedule": settings.idempotency.cleanup_interval,
+    },
+}
 
-def get_email(user: User, subject: str, orders: list[OrderPublic]):
+
+def get_email(user: UserPublic, subject: str, orders: list[OrderPublic]):
     """Email message options"""
 
     email = EmailMessage()
@@ -52,11 +76,86 @@ def get_email(user: User, subject: str, orders: list[OrderPublic]):
     return email
 
 
-@celery.task
-def send_email(user_: User, subject_: str, orders_: list[OrderPublic]):
+@celery.task(name="tasks.send_email")
+def send_email(user_: dict, subject_: str, orders_: list[dict]):
     """Send Email message"""
 
-    email = get_email(user=user_, subject=subject_, orders=orders_)
+    email = get_email(
+        user=UserPublic.parse_obj(user_),
+        subject=subject_,
+        orders=[OrderPublic.parse_obj(order) for order in orders_],
+    )
     with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT) as server:
         server.login(SMTP_USER, SMTP_PASS)
         server.send_message(email)
+
+
+@celery.task(name="tasks.expire_pending_orders")
+def expire_pending_orders():
+    """Cancel abandoned carts"""
+
+    async def run() -> int:
+        try:
+            return await orders.expire_pending(
+                max_age=settings.orders.pending_ttl,
+                batch_size=settings.orders.expiration_batch_size,
+            )
+        finally:
+            # Connections can not be reused within the next event loop
+            await dispose_engine()
+
+    return asyncio.run(run())
+
+
+@celery.task(name="tasks.archive_orders")
+def archive_orders():
+    """Move the finished orders to the archive"""
+
+    async def run() -> int:
+        try:
+            return await orders.archive(
+                max_age=settings.orders.archive_after,
+                batch_size=settings.orders.archive_batch_size,
+            )
+        finally:
+            await dispose_engine()
+
+    return asyncio.run(run())
+
+
+# The outbox topic -> the task that handles the message
+OUTBOX_TASKS = {
+    orders.ORDERS_EMAIL_TOPIC: send_email,
+}
+
+
+def dispatch(topic: str, payload: dict) -> None:
+    OUTBOX_TASKS[topic].delay(**payload)
+
+
+@celery.task(name="tasks.relay_outbox")
+def relay_outbox():
+    """Pass the outbox messages to the broker"""
+
+    async def run() -> int:
+        try:
+            return await relay(
+                dispatch=dispatch, batch_size=settings.outbox.batch_size
+            )
+        finally:
+            await dispose_engine()
+
+    return asyncio.run(run())
+
+
+@celery.task(name="tasks.cleanup_idempotency_keys")
+def cleanup_idempotency_keys():
+    """Remove the expired idempotency keys"""
+
+    async def run() -> None:
+        try:
+            await idempotency.cleanup()
+        finally:
+            await dispose_engine()
+
+    asyncio.run(run())
@@ -1,11 +1,15 @@
 """src/confid/config.py"""
 
 import os
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from dotenv import load_dotenv
-from passlib.context import CryptContext
-from pydantic import BaseConfig, BaseModel, BaseSettings
+from pydantic import BaseConfig, BaseModel, BaseSettings, Field
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
 
 load_dotenv()
 
@@ -42,12 +46,201 @@ class DatabaseSettings(BaseModel):
     """Configure SQLite3 Database settings."""
 
     name: str = "db.sqlite3"
+    # Connections that are opened on startup
+    warmup_connections: int = 1
+    # Create the tables on the application startup,
+    # it is turned off in the workers of the production server
+    create_tables: bool = True
+
+    # Connections pool of every worker process
+    pool_size: int = 5
+    pool_max_overflow: int = 10
+    # Waiting for a free connection longer than this fails the request,
+    # so the requests are not queued behind the slow ones forever
+    pool_timeout: float = 5.0  # seconds
+    # Connections are reopened after this period, -1 - never
+    pool_recycle: int = 1800  # seconds
 
     @property
     def url(self) -> str:
         return f"sqlite+aiosqlite:///./{self.name}"
 
 
+# Server Settings
+class ServerSettings(BaseModel):
+    """Configure the production ASGI server (see src/server.py)."""
+
+    host: str = "127.0.0.1"
+    port: int = 8000
+    # Worker processes, the CPU count by default
+    workers: int = os.cpu_count() or 1
+    # The uvloop and httptools are used if they are installed
+    loop: str = "auto"
+    http: str = "auto"
+    # The pending connections queue size
+    backlog: int = 2048
+    # Seconds to keep the idle connection open,
+    # should be higher than the load balancer one
+    keepalive: int = 5
+    # Workers that are silent longer are restarted
+    timeout: int = 60  # seconds
+    # Time given to the workers to finish requests on shutdown
+    graceful_timeout: int = 30  # seconds
+    # Restart workers after this number of requests, 0 - disabled
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+
+
+# HTTP Caching Settings
+class CacheSettings(BaseModel):
+    """Configure HTTP caching settings."""
+
+    # The Cache-Control max-age of the catalogue endpoints
+    products_max_age: int = 60  # seconds
+
+
+# Compression Settings
+class CompressionSettings(BaseModel):
+    """Configure the responses compression.
+    The brotli and zstd encodings are used only if the brotli
+    and zstandard packages are installed.
+    """
+
+    enabled: bool = True
+
+    # Smaller responses are not compressed since it is not worth the CPU
+    minimum_size: int = 1024  # bytes
+
+    # Encodings in the order of the server preference
+    encodings: list[str] = ["zstd", "br", "gzip"]
+
+    # Compression levels, higher levels save the bandwidth
+    # in exchange for the CPU time
+    gzip_level: int = 6
+    brotli_quality: int = 4
+    zstd_level: int = 3
+
+
+# Rate Limiting Settings
+class LimitSettings(BaseModel):
+    """Configure the token bucket."""
+
+    # Tokens that are added to the bucket per second
+    rate: float = Field(gt=0)
+    # The bucket size, the number of requests that are allowed at once
+    burst: int = Field(ge=1)
+
+
+class RateLimitSettings(BaseModel):
+    """Configure the rate limiting.
+    The in-process buckets are used if the Redis url is not set,
+    so the limits are applied per worker.
+    """
+
+    enabled: bool = True
+    redis_url: str | None = None
+    # The requests are allowed if Redis does not answer within this time
+    redis_timeout: float = 0.5  # seconds
+
+    login: LimitSettings = LimitSettings(rate=0.2, burst=5)
+    users_create: LimitSettings = LimitSettings(rate=0.1, burst=3)
+    orders: LimitSettings = LimitSettings(rate=2, burst=20)
+
+
+# Orders Settings
+class OrdersSettings(BaseModel):
+    """Configure orders settings."""
+
+    # Pending orders (carts) older than this are cancelled
+    pending_ttl: int = 7 * 86400  # seconds
+    # How often the expiration runs and how many orders
+    # are cancelled within one transaction
+    expiration_interval: int = 600  # seconds
+    expiration_batch_size: int = 500
+    # Delivered and cancelled orders older than this
+    # are moved to the archive table
+    archive_after: int = 90 * 86400  # seconds
+    archive_interval: int = 86400  # seconds
+    archive_batch_size: int = 1000
+
+
+# Idempotency Settings
+class IdempotencySettings(BaseModel):
+    """Configure the Idempotency-Key header support."""
+
+    # Stored responses are replayed within this period
+    ttl: int = 86400  # seconds
+    # How often the expired keys are removed
+    cleanup_interval: int = 3600  # seconds
+
+
+# Outbox Settings
+class OutboxSettings(BaseModel):
+    """Configure the transactional outbox relay."""
+
+    relay_interval: int = 5  # seconds
+    batch_size: int = 100
+    # Messages are not retried after this number of failures
+    max_attempts: int = 10
+    # The failed message is retried after the delay that is doubled
+    # with every attempt, but not longer than the maximum one
+    retry_delay: int = 10  # seconds
+    max_retry_delay: int = 3600  # seconds
+    # Dispatched messages are removed after this period
+    retention: int = 7 * 86400  # seconds
+
+
+# Broker Settings
+class BrokerSettings(BaseModel):
+    """Configure the Celery broker."""
+
+    url: str = "redis://localhost:6379"
+
+
+# Timeouts Settings
+class TimeoutSettings(BaseModel):
+    """Configure the time limits of the request."""
+
+    # The whole request time, None - no deadline
+    deadline: float | None
+    # The time of every single statement, None - limited
+    # only by the deadline
+    statement: float | None
+
+
+class TimeoutsSettings(BaseModel):
+    """Configure the request deadlines and the statement timeouts.
+    Statements that exceed them are aborted and the request fails
+    with 503 Service Unavailable. The default ones are applied to all
+    requests, the routes may override the statement timeout but their
+    deadline can only be shorter than the default one.
+    """
+
+    enabled: bool = True
+
+    default: TimeoutSettings = TimeoutSettings(deadline=30, statement=5)
+    orders_pay: TimeoutSettings = TimeoutSettings(deadline=10, statement=2)
+    orders_shipped: TimeoutSettings = TimeoutSettings(deadline=10, statement=2)
+    analytics: TimeoutSettings = TimeoutSettings(deadline=20, statement=10)
+
+    # The Retry-After header value of the timed out requests
+    retry_after: int = 1  # seconds
+
+
+# Health Settings
+class HealthSettings(BaseModel):
+    """Configure the readiness checks."""
+
+    # Every check fails if it is not finished within this time
+    timeout: float = 2.0  # seconds
+    check_broker: bool = True
+
+    # The failed warmup is retried after the delay that is doubled
+    # with every attempt, the worker is not ready until it is done
+    warmup_retry_delay: float = 1.0  # seconds
+    warmup_max_retry_delay: float = 30.0  # seconds
+
+
 # Kafka Settings
 class KafkaSettings(BaseModel):
     """Configure Kafka settings."""
@@ -98,7 +291,14 @@ class AuthenticationSettings(BaseModel):
     scheme: str = "Bearer"
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache
+def get_pwd_context() -> "CryptContext":
+    """Return the passwords hashing context. The passlib and the bcrypt
+    backend are imported on the first use to speed up the startup."""
+
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 # Settings are powered by pydantic
@@ -112,10 +312,20 @@ class Settings(BaseSettings):
 
     # Infrastructure settings
     database: DatabaseSettings = DatabaseSettings()
+    server: ServerSettings = ServerSettings()
+    broker: BrokerSettings = BrokerSettings()
 
     # Application configuration
     public_api: PublicApiSettings = PublicApiSettings()
     logging: LoggingSettings = LoggingSettings()
+    cache: CacheSettings = CacheSettings()
+    compression: CompressionSettings = CompressionSettings()
+    rate_limit: RateLimitSettings = RateLimitSettings()
+    timeouts: TimeoutsSettings = TimeoutsSettings()
+    idempotency: IdempotencySettings = IdempotencySettings()
+    orders: OrdersSettings = OrdersSettings()
+    outbox: OutboxSettings = OutboxSettings()
+    health: HealthSettings = HealthSettings()
     authentication: AuthenticationSettings = AuthenticationSettings()
 
     class Config(BaseConfig):
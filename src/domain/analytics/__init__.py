@@ -0,0 +1,4 @@
+"""src/domain/analytics/__init__.py"""
+
+from src.domain.analytics.models import *  # noqa: F401, F403
+from src.domain.analytics.repository import *  # noqa: F401, F403
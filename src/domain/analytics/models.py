@@ -0,0 +1,41 @@
+"""src/domain/analytics/models.py"""
+
+from datetime import date
+
+from pydantic import Field
+
+from src.domain.constants import OrderStatus
+from src.infrastructure.models import PublicModel
+
+__all__ = (
+    "ProductDailySalesPublic",
+    "TopSellerPublic",
+    "StatusCountPublic",
+)
+
+
+# Public models
+# ------------------------------------------------------
+class ProductDailySalesPublic(PublicModel):
+    """The product sales within one day."""
+
+    product_id: int = Field(description="OpenAPI description")
+    day: date = Field(description="OpenAPI description")
+    amount: int = Field(description="OpenAPI description")
+    revenue: int = Field(description="OpenAPI description")
+
+
+class TopSellerPublic(PublicModel):
+    """The product sales within the requested period."""
+
+    product_id: int = Field(description="OpenAPI description")
+    name: str | None = Field(description="OpenAPI description")
+    amount: int = Field(description="OpenAPI description")
+    revenue: int = Field(description="OpenAPI description")
+
+
+class StatusCountPublic(PublicModel):
+    """The number of orders with the status."""
+
+    status: OrderStatus = Field(description="OpenAPI description")
+    count: int = Field(description="OpenAPI description")
@@ -0,0 +1,239 @@
+"""src/domain/analytics/repository.py"""
+
+from datetime import date
+from typing import Any, AsyncGenerator, Iterable
+
+from sqlalchemy import (
+    Date,
+    Result,
+    cast,
+    delete,
+    desc,
+    func,
+    select,
+    union_all,
+)
+
+from src.domain.analytics.models import (
+    ProductDailySalesPublic,
+    StatusCountPublic,
+    TopSellerPublic,
+)
+from src.domain.constants import SOLD_STATUSES, OrderStatus
+from src.infrastructure.database import (
+    BaseRepository,
+    OrdersArchiveTable,
+    OrdersStatusCountsTable,
+    OrdersTable,
+    ProductsTable,
+    SalesDailyTable,
+)
+
+__all__ = ("SalesDailyRepository", "OrdersStatusCountsRepository")
+
+
+def _all_orders(*columns: str) -> Any:
+    """Return the subquery of the orders together with the archived ones,
+    the rollups are rebuilt from both of them."""
+
+    return union_all(
+        *(
+            select(*(getattr(table, column) for column in columns))
+            for table in (OrdersTable, OrdersArchiveTable)
+        )
+    ).subquery("all_orders")
+
+
+class SalesDailyRepository(BaseRepository[SalesDailyTable]):
+    """The rollup of the sold products per day. It is maintained
+    incrementally on the orders status transitions."""
+
+    schema_class = SalesDailyTable
+
+    async def add_orders(
+        self, orders_ids_: Iterable[int], sign_: int = 1
+    ) -> None:
+        """Add (or subtract if the sign is negative) the orders
+        to the sales of their order date, so the result is the same
+        as the rebuild gives."""
+
+        orders_ids_ = list(orders_ids_)
+        if not orders_ids_:
+            return
+
+        day = self._day(OrdersTable.order_date)
+        source = (
+            select(
+                OrdersTable.product_id,
+                day,
+                func.sum(OrdersTable.amount) * sign_,
+                func.sum(OrdersTable.amount * self._price(OrdersTable))
+                * sign_,
+            )
+            .join(ProductsTable, OrdersTable.product_id == ProductsTable.id)
+            .where(OrdersTable.id.in_(orders_ids_))
+            .group_by(OrdersTable.product_id, day)
+        )
+
+        query = self._insert().from_select(
+            ["product_id", "day", "amount", "revenue"], source
+        )
+        query = query.on_conflict_do_update(
+            index_elements=["product_id", "day"],
+            set_={
+                "amount": self.schema_class.amount + query.excluded.amount,
+                "revenue": self.schema_class.revenue + query.excluded.revenue,
+            },
+        )
+        await self.execute(query)
+
+    def _day(self, column: Any) -> Any:
+        """Return the date part of the datetime column."""
+
+        if self._dialect == "postgresql":
+            return cast(column, Date)
+
+        return func.date(column)
+
+    @staticmethod
+    def _price(table: Any) -> Any:
+        """Return the paid price of the order. The current product
+        price is used for the orders that are paid before
+        the price is stored with them."""
+
+        return func.coalesce(table.price, ProductsTable.price)
+
+    async def daily(
+        self,
+        since_: date | None = None,
+        until_: date | None = None,
+        product_id_: int | None = None,
+        skip_: int = 0,
+        limit_: int | None = None,
+    ) -> AsyncGenerator[ProductDailySalesPublic, None]:
+        criteria = self._period(since_, until_)
+
+        if product_id_ is not None:
+            criteria.append(self.schema_class.product_id == product_id_)
+
+        query = (
+            select(
+                *(
+                    getattr(self.schema_class, field)
+                    for field in ProductDailySalesPublic.__fields__
+                )
+            )
+            .where(*criteria)
+            .order_by(
+                desc(self.schema_class.day), self.schema_class.product_id
+            )
+            .offset(skip_)
+        )
+
+        if limit_ is not None:
+            query = query.limit(limit_)
+
+        result: Result = await self.execute(query)
+
+        for row in result.all():
+            yield ProductDailySalesPublic.from_orm(row)
+
+    async def top_sellers(
+        self,
+        since_: date | None = None,
+        until_: date | None = None,
+        limit_: int = 10,
+    ) -> AsyncGenerator[TopSellerPublic, None]:
+        amount = func.sum(self.schema_class.amount).label("amount")
+        query = (
+            select(
+                self.schema_class.product_id,
+                ProductsTable.name,
+                amount,
+                func.sum(self.schema_class.revenue).label("revenue"),
+            )
+            .outerjoin(
+                ProductsTable,
+                self.schema_class.product_id == ProductsTable.id,
+            )
+            .where(*self._period(since_, until_))
+            .group_by(self.schema_class.product_id, ProductsTable.name)
+            .order_by(desc(amount))
+            .limit(limit_)
+        )
+        result: Result = await self.execute(query)
+
+        for row in result.all():
+            yield TopSellerPublic.from_orm(row)
+
+    async def rebuild(self) -> None:
+        """Recompute the rollup from the orders and the archive tables.
+        The sold orders are counted by the order date."""
+
+        await self.execute(delete(self.schema_class))
+
+        orders = _all_orders(
+            "product_id", "order_date", "amount", "price", "status"
+        ).c
+        day = self._day(orders.order_date)
+        source = (
+            select(
+                orders.product_id,
+                day,
+                func.sum(orders.amount),
+                func.sum(orders.amount * self._price(orders)),
+            )
+            # The archived orders products could be removed already
+            .outerjoin(ProductsTable, orders.product_id == ProductsTable.id)
+            .where(orders.status.in_(SOLD_STATUSES))
+            .group_by(orders.product_id, day)
+        )
+        await self.execute(
+            self._insert().from_select(
+                ["product_id", "day", "amount", "revenue"], source
+            )
+        )
+
+    def _period(self, since: date | None, until: date | None) -> list:
+        criteria = []
+
+        if since is not None:
+            criteria.append(self.schema_class.day >= since)
+        if until is not None:
+            criteria.append(self.schema_class.day <= until)
+
+        return criteria
+
+
+class OrdersStatusCountsRepository(BaseRepository[OrdersStatusCountsTable]):
+    """The rollup of the orders number per status."""
+
+    schema_class = OrdersStatusCountsTable
+
+    async def add(self, status_: OrderStatus, count_: int = 1) -> None:
+        if not count_:
+            return
+
+        query = self._insert().values(status=status_, count=count_)
+        query = query.on_conflict_do_update(
+            index_elements=["status"],
+            set_={"count": self.schema_class.count + query.excluded.count},
+        )
+        await self.execute(query)
+
+    async def all(self) -> AsyncGenerator[StatusCountPublic, None]:
+        async for row in self._rows(StatusCountPublic.__fields__):
+            yield StatusCountPublic.from_orm(row)
+
+    async def rebuild(self) -> None:
+        """Recompute the rollup from the orders and the archive tables."""
+
+        await self.execute(delete(self.schema_class))
+
+        orders = _all_orders("id", "status").c
+        source = select(orders.status, func.count(orders.id)).group_by(
+            orders.status
+        )
+        await self.execute(
+            self._insert().from_select(["status", "count"], source)
+        )
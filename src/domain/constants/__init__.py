@@ -1,3 +1,4 @@
 """src/domain/constants/__init__.py"""
 
 from src.domain.constants.orders import *  # noqa: F401, F403
+from src.domain.constants.products import *  # noqa: F401, F403
@@ -2,7 +2,7 @@
 
 from enum import Enum
 
-__all__ = ("OrderStatus",)
+__all__ = ("OrderStatus", "SOLD_STATUSES", "FINAL_STATUSES")
 
 
 class OrderStatus(Enum):
@@ -13,3 +13,13 @@ class OrderStatus(Enum):
     SHIPPED = "SHIPPED"
     DELIVERED = "DELIVERED"
     CANCELLED = "CANCELLED"
+
+
+# Statuses of the orders that are counted as sales
+SOLD_STATUSES = frozenset(
+    (OrderStatus.PAID, OrderStatus.SHIPPED, OrderStatus.DELIVERED)
+)
+
+# Statuses of the orders that are not changed anymore,
+# such orders are moved to the archive after a while
+FINAL_STATUSES = frozenset((OrderStatus.DELIVERED, OrderStatus.CANCELLED))
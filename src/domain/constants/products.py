@@ -0,0 +1,24 @@
+"""src/domain/constants/products.py"""
+
+from enum import Enum
+
+__all__ = ("ProductsSorting",)
+
+
+class ProductsSorting(Enum):
+    """Values for Products list sorting, the minus means descending"""
+
+    ID = "id"
+    ID_DESC = "-id"
+    PRICE = "price"
+    PRICE_DESC = "-price"
+    NAME = "name"
+    NAME_DESC = "-name"
+
+    @property
+    def column(self) -> str:
+        return self.value.lstrip("-")
+
+    @property
+    def descending(self) -> bool:
+        return self.value.startswith("-")
@@ -10,6 +10,10 @@ from src.infrastructure.models import InternalModel, PublicModel
 __all__ = (
     "OrderCreateRequestBody",
     "OrderPublic",
+    "OrderProductPublic",
+    "OrderWithProductPublic",
+    "CartLinePublic",
+    "CartSummaryPublic",
     "OrderUncommited",
     "Order",
 )
@@ -40,6 +44,39 @@ class OrderPublic(_OrderPublic):
     delivery_address: str
     status: OrderStatus = OrderStatus.PENDING
     order_date: datetime = datetime.utcnow()
+    version: int = 1
+
+
+class OrderProductPublic(PublicModel):
+    """The product details that are shown with the order."""
+
+    id: int
+    name: str = Field(description="OpenAPI description")
+    price: int = Field(description="OpenAPI description")
+
+
+class OrderWithProductPublic(OrderPublic):
+    """The order representation with the ordered product."""
+
+    product: OrderProductPublic
+
+
+class CartLinePublic(PublicModel):
+    """The cart line that groups pending orders of the same product."""
+
+    product_id: int
+    name: str
+    price: int
+    amount: int
+    total: int
+
+
+class CartSummaryPublic(PublicModel):
+    """The cart lines with the totals."""
+
+    lines: list[CartLinePublic]
+    items_count: int = 0
+    total: int = 0
 
 
 # Internal models
@@ -52,10 +89,11 @@ class OrderUncommited(InternalModel):
     user_id: int
     delivery_address: str
     status: OrderStatus = OrderStatus.PENDING
-    order_date: datetime = datetime.utcnow()
+    order_date: datetime = Field(default_factory=datetime.utcnow)
 
 
 class Order(OrderUncommited):
     """Existed order representation."""
 
     id: int
+    version: int = 1
@@ -1,13 +1,45 @@
 """src/domain/orders/repository.py"""
 
-from typing import Any, AsyncGenerator
+from collections import Counter
+from datetime import datetime
+from functools import cached_property
+from typing import Any, AsyncGenerator, NoReturn
 
-from sqlalchemy import Result, select
+from sqlalchemy import (
+    Result,
+    case,
+    delete,
+    desc,
+    func,
+    insert,
+    literal,
+    select,
+    union_all,
+    update,
+)
 
-from src.domain.constants import OrderStatus
-from src.domain.orders.models import Order, OrderUncommited
-from src.infrastructure.database import BaseRepository, OrdersTable
-from src.infrastructure.database.tables import ConcreteTable
+from src.domain.analytics import (
+    OrdersStatusCountsRepository,
+    SalesDailyRepository,
+)
+from src.domain.constants import FINAL_STATUSES, SOLD_STATUSES, OrderStatus
+from src.domain.orders.models import (
+    CartLinePublic,
+    CartSummaryPublic,
+    Order,
+    OrderProductPublic,
+    OrderPublic,
+    OrderUncommited,
+    OrderWithProductPublic,
+)
+from src.domain.products import ProductRepository
+from src.infrastructure.database import (
+    BaseRepository,
+    OrdersArchiveTable,
+    OrdersTable,
+    ProductsTable,
+)
+from src.infrastructure.errors import ConflictError, NotFoundError
 
 __all__ = ("OrdersRepository",)
 
@@ -15,6 +47,19 @@ __all__ = ("OrdersRepository",)
 class OrdersRepository(BaseRepository[OrdersTable]):
     schema_class = OrdersTable
 
+    # The analytics rollups repositories are created once per instance
+    @cached_property
+    def _counts(self) -> OrdersStatusCountsRepository:
+        return OrdersStatusCountsRepository()
+
+    @cached_property
+    def _sales(self) -> SalesDailyRepository:
+        return SalesDailyRepository()
+
+    @cached_property
+    def _products(self) -> ProductRepository:
+        return ProductRepository()
+
     async def all(
         self, skip_: int = 0, limit_: int | None = None
     ) -> AsyncGenerator[Order, None]:
@@ -23,45 +68,111 @@ class OrdersRepository(BaseRepository[OrdersTable]):
 
     async def all_pending(
         self, value_: int, skip_: int = 0, limit_: int | None = None
-    ) -> AsyncGenerator[ConcreteTable, None]:
+    ) -> AsyncGenerator[OrderPublic, None]:
+        async for order in self._all_public(
+            OrderPublic,
+            filters={"user_id": value_, "status": OrderStatus.PENDING},
+            skip=skip_,
+            limit=limit_,
+        ):
+            yield order
+
+    async def all_pending_with_products(
+        self, value_: int, skip_: int = 0, limit_: int | None = None
+    ) -> AsyncGenerator[OrderWithProductPublic, None]:
+        async for instance in self._all(
+            filters={"user_id": value_, "status": OrderStatus.PENDING},
+            skip=skip_,
+            limit=limit_,
+            options=[
+                self._joined("product", columns=OrderProductPublic.__fields__)
+            ],
+            cache_key="with_products",
+        ):
+            yield OrderWithProductPublic.from_orm(instance)
+
+    async def cart_summary(self, value_: int) -> CartSummaryPublic:
+        """Return the user's cart totals that are computed
+        by the database in a single query."""
+
+        amount = func.sum(self.schema_class.amount)
         query = (
-            select(self.schema_class)
+            select(
+                self.schema_class.product_id,
+                ProductsTable.name,
+                ProductsTable.price,
+                amount.label("amount"),
+                (amount * ProductsTable.price).label("total"),
+            )
+            .join(
+                ProductsTable, self.schema_class.product_id == ProductsTable.id
+            )
             .where(self.schema_class.user_id == value_)
             .where(self.schema_class.status == OrderStatus.PENDING)
-            .offset(skip_)
+            .group_by(
+                self.schema_class.product_id,
+                ProductsTable.name,
+                ProductsTable.price,
+            )
+            .order_by(self.schema_class.product_id)
         )
-
-        if limit_ is not None:
-            query = query.limit(limit_)
-
         result: Result = await self.execute(query)
 
-        schemas = result.scalars().all()
+        lines = [CartLinePublic.from_orm(row) for row in result.all()]
 
-        for schema in schemas:
-            yield schema
+        return CartSummaryPublic(
+            lines=lines,
+            items_count=sum(line.amount for line in lines),
+            total=sum(line.total for line in lines),
+        )
 
     async def all_paid(
         self, value_: int | None, skip_: int = 0, limit_: int | None = None
-    ) -> AsyncGenerator[ConcreteTable, None]:
-        query = select(self.schema_class).where(
-            self.schema_class.status == OrderStatus.PAID
-        )
+    ) -> AsyncGenerator[OrderPublic, None]:
+        filters: dict[str, Any] = {"status": OrderStatus.PAID}
 
         if value_ is not None:
-            query = query.where(self.schema_class.user_id == value_)
+            filters["user_id"] = value_
 
-        query = query.offset(skip_)
+        async for order in self._all_public(
+            OrderPublic, filters=filters, skip=skip_, limit=limit_
+        ):
+            yield order
 
-        if limit_ is not None:
-            query = query.limit(limit_)
+    async def history(
+        self,
+        value_: int,
+        archived_: bool = False,
+        skip_: int = 0,
+        limit_: int | None = None,
+    ) -> AsyncGenerator[OrderPublic, None]:
+        """Return the user's orders, the newest first.
+        The archive is queried only if archived_ is set."""
 
-        result: Result = await self.execute(query)
+        fields = list(OrderPublic.__fields__)
+        query = select(
+            *(getattr(self.schema_class, field) for field in fields)
+        ).where(self.schema_class.user_id == value_)
 
-        schemas = result.scalars().all()
+        if archived_:
+            query = union_all(
+                query,
+                select(
+                    *(getattr(OrdersArchiveTable, field) for field in fields)
+                ).where(OrdersArchiveTable.user_id == value_),
+            )
 
-        for schema in schemas:
-            yield schema
+        orders = query.subquery()
+        query = (
+            select(orders)
+            .order_by(desc(orders.c.order_date), desc(orders.c.id))
+            .offset(skip_)
+            .limit(limit_)
+        )
+        result: Result = await self.execute(query)
+
+        for row in result.all():
+            yield OrderPublic.from_orm(row)
 
     async def get(self, key_: str, value_: Any) -> Order:
         instance = await self._get(key=key_, value=value_)
@@ -69,13 +180,308 @@ class OrdersRepository(BaseRepository[OrdersTable]):
 
     async def create(self, schema: OrderUncommited) -> Order:
         instance: OrdersTable = await self._save(schema.dict())
+        await self._counts.add(status_=instance.status)
+
         return Order.from_orm(instance)
 
     async def update(
         self, key_: str, value_: Any, payload_: dict[str, Any]
     ) -> Order:
-        instance = await self._update(key=key_, value=value_, payload=payload_)
+        if "status" not in payload_:
+            instance = await self._update(
+                key=key_, value=value_, payload=payload_, bump_version=True
+            )
+            return Order.from_orm(instance)
+
+        # Remember the previous statuses to maintain the analytics rollups
+        previous: dict[int, OrderStatus] = {
+            row.id: row.status
+            async for row in self._rows(
+                ("id", "status"), filters={key_: value_}
+            )
+        }
+
+        instance = await self._update(
+            key=key_, value=value_, payload=payload_, bump_version=True
+        )
+        await self._transitioned(previous, OrderStatus(payload_["status"]))
+
         return Order.from_orm(instance)
 
+    async def update_many(
+        self,
+        payloads_: list[dict[str, Any]],
+        from_: OrderStatus,
+        versions_: dict[int, int] | None = None,
+    ) -> list[int]:
+        """Update many orders by their ids with one conditional UPDATE.
+        Every payload includes the id and the same fields.
+        Only the orders that are still in the from_ status, and have
+        the expected versions if they are passed, are updated.
+        Return the ids of the updated orders."""
+
+        if not payloads_:
+            return []
+
+        table = self.schema_class.__table__
+        ids = [payload["id"] for payload in payloads_]
+
+        values: dict[str, Any] = {"version": table.c.version + 1}
+        for field in payloads_[0].keys() - {"id"}:
+            column = table.c[field]
+            values[field] = case(
+                {
+                    payload["id"]: literal(payload[field], column.type)
+                    for payload in payloads_
+                },
+                value=table.c.id,
+            )
+
+        query = (
+            update(table)
+            .where(table.c.id.in_(ids), table.c.status == from_)
+            .values(values)
+            .returning(table.c.id)
+        )
+        if versions_ is not None:
+            query = query.where(
+                table.c.version == case(versions_, value=table.c.id)
+            )
+
+        result: Result = await self.execute(query)
+        updated: list[int] = list(result.scalars().all())
+
+        if "status" in values:
+            # The previous status of every updated order is from_
+            statuses = {
+                payload["id"]: OrderStatus(payload["status"])
+                for payload in payloads_
+            }
+            for status in set(statuses.values()):
+                await self._transitioned(
+                    {id_: from_ for id_ in updated if statuses[id_] == status},
+                    status,
+                )
+
+        return updated
+
     async def delete(self, id_: int) -> None:
-        await self._delete(id_)
+        result: Result = await self.execute(
+            delete(self.schema_class)
+            .where(self.schema_class.id == id_)
+            .returning(self.schema_class.status)
+        )
+
+        for status in result.scalars().all():
+            await self._counts.add(status_=status, count_=-1)
+
+    async def transition(
+        self,
+        id_: int,
+        from_: OrderStatus,
+        to_: OrderStatus,
+        version_: int | None = None,
+        user_id_: int | None = None,
+    ) -> Order | None:
+        """Move the order from one status to another with a single
+        conditional UPDATE, without locking or reading it before.
+        The version and the owner are checked only if they are passed.
+        Return None if the order does not meet the conditions."""
+
+        query = (
+            update(self.schema_class)
+            .where(self.schema_class.id == id_)
+            .where(self.schema_class.status == from_)
+            .values(status=to_, version=self.schema_class.version + 1)
+            .returning(self.schema_class)
+            .options(self._load())
+            .execution_options(synchronize_session=False)
+        )
+
+        if version_ is not None:
+            query = query.where(self.schema_class.version == version_)
+        if user_id_ is not None:
+            query = query.where(self.schema_class.user_id == user_id_)
+
+        result: Result = await self.execute(query)
+
+        if not (instance := result.scalar_one_or_none()):
+            return None
+
+        order = Order.from_orm(instance)
+        await self._transitioned({order.id: from_}, to_)
+
+        return order
+
+    async def cancel(
+        self,
+        id_: int,
+        version_: int | None = None,
+        user_id_: int | None = None,
+    ) -> Order:
+        """Cancel the pending or paid order. The paid order products
+        are returned to the stock within the same transaction."""
+
+        for from_ in (OrderStatus.PENDING, OrderStatus.PAID):
+            order = await self.transition(
+                id_=id_,
+                from_=from_,
+                to_=OrderStatus.CANCELLED,
+                version_=version_,
+                user_id_=user_id_,
+            )
+            if order is None:
+                continue
+
+            if from_ == OrderStatus.PAID:
+                await self._products.update(
+                    key_="id",
+                    value_=order.product_id,
+                    payload_={"amount": ProductsTable.amount + order.amount},
+                )
+
+            return order
+
+        await self._check_conflict(id_, user_id_)
+
+    async def deliver(self, id_: int, version_: int | None = None) -> Order:
+        """Mark the shipped order as delivered."""
+
+        order = await self.transition(
+            id_=id_,
+            from_=OrderStatus.SHIPPED,
+            to_=OrderStatus.DELIVERED,
+            version_=version_,
+        )
+
+        if order is None:
+            await self._check_conflict(id_)
+
+        return order
+
+    async def _check_conflict(
+        self, id_: int, user_id_: int | None = None
+    ) -> NoReturn:
+        """Explain why the conditional transition is not applied.
+        It is called only on failure so the happy path stays
+        a single statement."""
+
+        order = await self.get(key_="id", value_=id_)
+
+        if user_id_ is not None and order.user_id != user_id_:
+            raise NotFoundError
+
+        raise ConflictError(
+            message=(
+                f"The order is changed concurrently or can not be moved "
+                f"from the {order.status} status"
+            )
+        )
+
+    async def expire_pending(
+        self, before_: datetime, limit_: int
+    ) -> tuple[int, int]:
+        """Cancel at most limit_ of the oldest pending orders that are
+        created before the given date. Return the number of the found
+        orders and the number of the cancelled ones, the rest of them
+        are paid concurrently."""
+
+        result: Result = await self.execute(
+            select(self.schema_class.id)
+            .where(self.schema_class.status == OrderStatus.PENDING)
+            .where(self.schema_class.order_date < before_)
+            .order_by(self.schema_class.order_date)
+            .limit(limit_)
+        )
+        if not (ids := result.scalars().all()):
+            return 0, 0
+
+        # The status is checked again since the orders could be paid
+        result = await self.execute(
+            update(self.schema_class)
+            .where(self.schema_class.id.in_(ids))
+            .where(self.schema_class.status == OrderStatus.PENDING)
+            .values(
+                status=OrderStatus.CANCELLED,
+                version=self.schema_class.version + 1,
+            )
+            .returning(self.schema_class.id)
+            .execution_options(synchronize_session=False)
+        )
+        expired = result.scalars().all()
+
+        await self._transitioned(
+            {id_: OrderStatus.PENDING for id_ in expired},
+            OrderStatus.CANCELLED,
+        )
+
+        return len(ids), len(expired)
+
+    async def archive(self, before_: datetime, limit_: int) -> int:
+        """Move at most limit_ of the oldest delivered and cancelled
+        orders that are created before the given date to the archive.
+        The analytics rollups are kept as is since the orders
+        are not removed. Return the number of the archived orders."""
+
+        result: Result = await self.execute(
+            select(self.schema_class.id)
+            .where(self.schema_class.status.in_(FINAL_STATUSES))
+            .where(self.schema_class.order_date < before_)
+            .order_by(self.schema_class.order_date)
+            .limit(limit_)
+        )
+        if not (ids := result.scalars().all()):
+            return 0
+
+        columns = [
+            column.key for column in self.schema_class.__table__.columns
+        ]
+        await self.execute(
+            insert(OrdersArchiveTable).from_select(
+                [*columns, "archived_at"],
+                select(
+                    *(
+                        getattr(self.schema_class, column)
+                        for column in columns
+                    ),
+                    literal(datetime.utcnow()),
+                ).where(self.schema_class.id.in_(ids)),
+            )
+        )
+        await self.execute(
+            delete(self.schema_class)
+            .where(self.schema_class.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+
+        return len(ids)
+
+    async def _transitioned(
+        self, previous: dict[int, OrderStatus], status: OrderStatus
+    ) -> None:
+        """Update the analytics rollups with the orders
+        that are moved from the previous statuses to the new one."""
+
+        changed = {id_: old for id_, old in previous.items() if old != status}
+
+        counts = self._counts
+        for old, count in Counter(changed.values()).items():
+            await counts.add(status_=old, count_=-count)
+        await counts.add(status_=status, count_=len(changed))
+
+        sales = self._sales
+        await sales.add_orders(
+            (
+                id_
+                for id_, old in changed.items()
+                if old not in SOLD_STATUSES and status in SOLD_STATUSES
+            ),
+        )
+        await sales.add_orders(
+            (
+                id_
+                for id_, old in changed.items()
+                if old in SOLD_STATUSES and status not in SOLD_STATUSES
+            ),
+            sign_=-1,
+        )
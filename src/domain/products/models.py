@@ -31,6 +31,7 @@ class ProductPublic(_ProductPublic):
     """The internal application representation."""
 
     id: int
+    version: int
 
 
 # Internal models
@@ -52,3 +53,4 @@ class Product(_ProductInternal):
     """Existed product representation."""
 
     id: int
+    version: int = 1
@@ -1,13 +1,33 @@
 """src/domain/products/repository.py"""
 
+import re
 from typing import Any, AsyncGenerator
 
-from src.domain.products.models import Product, ProductUncommited
-from src.infrastructure.database import BaseRepository, ProductsTable
+from sqlalchemy import Result, bindparam, case, select, text, update
+
+from src.domain.constants import ProductsSorting
+from src.domain.products.models import (
+    Product,
+    ProductPublic,
+    ProductUncommited,
+)
+from src.infrastructure.database import (
+    PRODUCTS_SEARCH_TABLE,
+    BaseRepository,
+    ProductsTable,
+    decode_cursor,
+    encode_cursor,
+)
+from src.infrastructure.database.single_flight import single_flight
+from src.infrastructure.errors import NotFoundError
 
 __all__ = ("ProductRepository",)
 
 
+# Words that are used for the full-text search
+_WORDS = re.compile(r"\w+")
+
+
 class ProductRepository(BaseRepository[ProductsTable]):
     schema_class = ProductsTable
 
@@ -17,19 +37,289 @@ class ProductRepository(BaseRepository[ProductsTable]):
         async for instance in self._all(skip=skip_, limit=limit_):
             yield Product.from_orm(instance)
 
+    async def filtered(
+        self,
+        min_price_: int | None = None,
+        max_price_: int | None = None,
+        in_stock_: bool = False,
+        name_prefix_: str | None = None,
+        sort_: ProductsSorting = ProductsSorting.ID,
+        cursor_: str | None = None,
+        skip_: int = 0,
+        limit_: int | None = None,
+    ) -> tuple[list[ProductPublic], str | None]:
+        """Return the filtered and sorted products page and the cursor
+        of the next page if the page is full."""
+
+        # The values are bound, so the statement is cached
+        # for every combination of the used filters
+        criteria = []
+        params: dict[str, Any] = {}
+
+        if min_price_ is not None:
+            criteria.append(self.schema_class.price >= bindparam("min_price"))
+            params["min_price"] = min_price_
+        if max_price_ is not None:
+            criteria.append(self.schema_class.price <= bindparam("max_price"))
+            params["max_price"] = max_price_
+        if in_stock_:
+            criteria.append(self.schema_class.amount > 0)
+        if name_prefix_:
+            # The range is used in place of LIKE to keep the index usage
+            criteria.append(self.schema_class.name >= bindparam("name_from"))
+            criteria.append(self.schema_class.name < bindparam("name_to"))
+            params["name_from"] = name_prefix_
+            params["name_to"] = name_prefix_[:-1] + chr(
+                ord(name_prefix_[-1]) + 1
+            )
+        if cursor_ is not None:
+            # The cursor holds the sorting column value and the id
+            column = getattr(self.schema_class, sort_.column)
+            cursor = decode_cursor(cursor_, column.type.python_type, int)
+            criteria.append(self._after(sort_.column, sort_.descending))
+            params["after_value"], params["after_id"] = cursor
+
+        products = [
+            product
+            async for product in self._all_public(
+                ProductPublic,
+                *criteria,
+                skip=skip_,
+                limit=limit_,
+                order_by=self._ordering(sort_.column, sort_.descending),
+                cache_key=("filtered", sort_, in_stock_, tuple(params)),
+                params=params,
+            )
+        ]
+
+        cursor = None
+        if products and limit_ is not None and len(products) == limit_:
+            last = products[-1]
+            cursor = encode_cursor(getattr(last, sort_.column), last.id)
+
+        return products, cursor
+
+    async def search(
+        self, query_: str, skip_: int = 0, limit_: int | None = None
+    ) -> AsyncGenerator[ProductPublic, None]:
+        """Search products by name and title using the full-text index.
+        Every word of the query is matched as a prefix and the products
+        are ordered by rank, the name matches are ranked higher."""
+
+        if not (words := _WORDS.findall(query_.lower())):
+            return
+
+        # NOTE: The PostgreSQL does not limit the rows by NULL
+        #       and rejects the negative LIMIT, the SQLite is the opposite
+        limit = limit_
+
+        if self._dialect == "postgresql":
+            match = " & ".join(f"{word}:*" for word in words)
+            query = text(
+                "SELECT p.id, p.name, p.title, p.price, p.amount, p.version "
+                f"FROM {PRODUCTS_SEARCH_TABLE} AS s "
+                "JOIN products AS p ON p.id = s.product_id "
+                "WHERE s.document @@ to_tsquery('simple', :match) "
+                "ORDER BY ts_rank(s.document, "
+                "to_tsquery('simple', :match)) DESC, p.id "
+                "LIMIT :limit OFFSET :skip"
+            )
+        else:
+            limit = -1 if limit_ is None else limit_
+            match = " ".join(f'"{word}"*' for word in words)
+            query = text(
+                "SELECT p.id, p.name, p.title, p.price, p.amount, p.version "
+                f"FROM {PRODUCTS_SEARCH_TABLE} AS s "
+                "JOIN products AS p ON p.id = s.rowid "
+                f"WHERE {PRODUCTS_SEARCH_TABLE} MATCH :match "
+                f"ORDER BY bm25({PRODUCTS_SEARCH_TABLE}, 10.0, 1.0), p.id "
+                "LIMIT :limit OFFSET :skip"
+            )
+
+        result: Result = await self.execute(
+            query.bindparams(
+                match=match,
+                skip=skip_,
+                limit=limit,
+            )
+        )
+
+        for row in result.all():
+            yield ProductPublic.from_orm(row)
+
+    @single_flight
+    async def get_version(self, key_: str, value_: Any) -> tuple[int, int]:
+        """Return the product id and version without loading the product."""
+
+        query = self._statement(
+            ("get_version", key_),
+            lambda: select(
+                self.schema_class.id, self.schema_class.version
+            ).where(
+                getattr(self.schema_class, key_) == bindparam("where_key")
+            ),
+        )
+        result: Result = await self.execute(query, {"where_key": value_})
+
+        if not (row := result.one_or_none()):
+            raise NotFoundError
+
+        return row.id, row.version
+
     async def get(self, key_: str, value_: Any) -> Product:
         instance = await self._get(key=key_, value=value_)
         return Product.from_orm(instance)
 
+    @single_flight
+    async def get_shared(self, key_: str, value_: Any) -> Product:
+        """The same as get, but the concurrent identical calls share
+        one query. Should not be used within the write transactions."""
+
+        return await self.get(key_=key_, value_=value_)
+
     async def create(self, schema_: ProductUncommited) -> Product:
         instance: ProductsTable = await self._save(schema_.dict())
+        await self._index(instance)
+
         return Product.from_orm(instance)
 
     async def update(
         self, key_: str, value_: Any, payload_: dict[str, Any]
     ) -> Product:
-        instance = await self._update(key=key_, value=value_, payload=payload_)
+        instance = await self._update(
+            key=key_,
+            value=value_,
+            payload=payload_,
+            bump_version=True,
+        )
+
+        if payload_.keys() & {"name", "title"}:
+            await self._index(instance)
+
         return Product.from_orm(instance)
 
+    async def update_many(self, payloads_: list[dict[str, Any]]) -> None:
+        """Update many products by their ids with one statement.
+        The searchable fields are not supported."""
+
+        await self._update_many(
+            key="id",
+            payloads=payloads_,
+            bump_version=True,
+        )
+
+    async def take(
+        self, amounts_: dict[int, int]
+    ) -> tuple[dict[int, int], dict[int, int]]:
+        """Take the products from the stock, up to the requested amounts
+        if there are not enough of them. Return the taken amounts
+        and the prices of the products by their ids.
+
+        The stock is decremented relatively by one statement that
+        does not go below zero, so the concurrent transactions can not
+        oversell the products. The products that are changed in between
+        are not affected by it, then they are read and taken again."""
+
+        taken: dict[int, int] = {}
+        prices: dict[int, int] = {}
+        left = dict(amounts_)
+
+        while left:
+            stock = {
+                row.id: row
+                async for row in self._rows(
+                    ("id", "amount", "price"),
+                    self.schema_class.id.in_(bindparam("ids", expanding=True)),
+                    cache_key="ids",
+                    params={"ids": list(left)},
+                )
+            }
+            if stock.keys() != left.keys():
+                raise NotFoundError
+
+            amounts = {}
+            for id_, amount in left.items():
+                if amount := min(amount, stock[id_].amount):
+                    amounts[id_] = amount
+                else:
+                    # Nothing to take, the stock is not changed
+                    taken[id_], prices[id_] = 0, stock[id_].price
+
+            if not amounts:
+                break
+
+            table = self.schema_class.__table__
+            amount = case(amounts, value=table.c.id)
+            query = (
+                update(table)
+                .where(table.c.id.in_(amounts), table.c.amount >= amount)
+                .values(
+                    amount=table.c.amount - amount,
+                    version=table.c.version + 1,
+                )
+                .returning(table.c.id, table.c.price)
+            )
+            result: Result = await self.execute(query)
+
+            left = {id_: left[id_] for id_ in amounts}
+            for row in result.all():
+                taken[row.id], prices[row.id] = amounts[row.id], row.price
+                del left[row.id]
+
+        return taken, prices
+
+    async def put_back(self, amounts_: dict[int, int]) -> None:
+        """Return the taken products to the stock
+        by one relative increment."""
+
+        if not (amounts := {id_: a for id_, a in amounts_.items() if a}):
+            return
+
+        table = self.schema_class.__table__
+        amount = case(amounts, value=table.c.id)
+        await self.execute(
+            update(table)
+            .where(table.c.id.in_(amounts))
+            .values(
+                amount=table.c.amount + amount,
+                version=table.c.version + 1,
+            )
+        )
+
     async def delete(self, id_: int) -> None:
+        await self._unindex(id_)
         await self._delete(id_)
+
+    async def _index(self, instance: ProductsTable) -> None:
+        """Put the product to the full-text search index."""
+
+        if self._dialect == "postgresql":
+            query = text(
+                f"INSERT INTO {PRODUCTS_SEARCH_TABLE} (product_id, document) "
+                "VALUES (:id, setweight(to_tsvector('simple', :name), 'A') "
+                "|| setweight(to_tsvector('simple', :title), 'B')) "
+                "ON CONFLICT (product_id) "
+                "DO UPDATE SET document = excluded.document"
+            )
+        else:
+            await self._unindex(instance.id)
+            query = text(
+                f"INSERT INTO {PRODUCTS_SEARCH_TABLE} (rowid, name, title) "
+                "VALUES (:id, :name, :title)"
+            )
+
+        await self.execute(
+            query.bindparams(
+                id=instance.id, name=instance.name, title=instance.title
+            )
+        )
+
+    async def _unindex(self, id_: int) -> None:
+        """Remove the product from the full-text search index."""
+
+        column = "product_id" if self._dialect == "postgresql" else "rowid"
+        await self.execute(
+            text(
+                f"DELETE FROM {PRODUCTS_SEARCH_TABLE} WHERE {column} = :id"
+            ).bindparams(id=id_)
+        )
@@ -6,7 +6,13 @@ from pydantic import Field
 
 from src.infrastructure.models import InternalModel, PublicModel
 
-__all__ = ("UserCreateRequestBody", "UserPublic", "UserUncommited", "User")
+__all__ = (
+    "UserCreateRequestBody",
+    "UserPublic",
+    "UserUncommited",
+    "User",
+    "UserIdentity",
+)
 
 
 # Public models
@@ -54,3 +60,11 @@ class User(UserUncommited):
 
     id: int
     is_manager: bool
+
+
+class UserIdentity(InternalModel):
+    """The authenticated user. Only the columns that are needed
+    for the authorization are loaded on every request."""
+
+    id: int
+    is_manager: bool
@@ -2,7 +2,12 @@
 
 from typing import Any, AsyncGenerator
 
-from src.domain.users.models import User, UserUncommited
+from src.domain.users.models import (
+    User,
+    UserIdentity,
+    UserPublic,
+    UserUncommited,
+)
 from src.infrastructure.database import BaseRepository, UsersTable
 
 __all__ = ("UsersRepository",)
@@ -17,10 +22,30 @@ class UsersRepository(BaseRepository[UsersTable]):
         async for instance in self._all(skip=skip_, limit=limit_):
             yield User.from_orm(instance)
 
+    async def all_public(
+        self, skip_: int = 0, limit_: int | None = None
+    ) -> AsyncGenerator[UserPublic, None]:
+        async for user in self._all_public(
+            UserPublic, skip=skip_, limit=limit_
+        ):
+            yield user
+
     async def get(self, key_: str, value_: Any) -> User:
         instance = await self._get(key=key_, value=value_)
         return User.from_orm(instance)
 
+    async def get_public(self, key_: str, value_: Any) -> UserPublic:
+        instance = await self._get(
+            key=key_, value=value_, columns=UserPublic.__fields__
+        )
+        return UserPublic.from_orm(instance)
+
+    async def get_identity(self, value_: int) -> UserIdentity:
+        instance = await self._get(
+            key="id", value=value_, columns=UserIdentity.__fields__
+        )
+        return UserIdentity.from_orm(instance)
+
     async def create(self, schema: UserUncommited) -> User:
         instance: UsersTable = await self._save(schema.dict())
         return User.from_orm(instance)
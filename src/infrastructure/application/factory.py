@@ -8,21 +8,41 @@ from fastapi import APIRouter, FastAPI
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 
+from src.config import CompressionSettings, TimeoutsSettings
+from src.infrastructure.database import DeadlineMiddleware, SessionMiddleware
 from src.infrastructure.errors import (
     BaseError,
     custom_base_errors_handler,
     pydantic_validation_errors_handler,
     python_base_error_handler,
 )
+from src.infrastructure.http import CompressionMiddleware
 
 __all__ = ("create",)
 
 
+# The event loop keeps only weak references to the tasks
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def _run_all(tasks: Iterable[Callable[[], Coroutine]]) -> None:
+    for task in tasks:
+        await task()
+
+
+def _run_in_background(tasks: Iterable[Callable[[], Coroutine]]) -> None:
+    background_task = asyncio.create_task(_run_all(tasks))
+    _background_tasks.add(background_task)
+    background_task.add_done_callback(_background_tasks.discard)
+
+
 def create(
     *_,
     rest_routers: Iterable[APIRouter],
     startup_tasks: Iterable[Callable[[], Coroutine]] | None = None,
     shutdown_tasks: Iterable[Callable[[], Coroutine]] | None = None,
+    compression: CompressionSettings | None = None,
+    timeouts: TimeoutsSettings | None = None,
     **kwargs,
 ) -> FastAPI:
     """
@@ -37,6 +57,20 @@ def create(
     for router in rest_routers:
         app.include_router(router)
 
+    # Create the database session per request
+    app.add_middleware(SessionMiddleware)
+
+    # Limit the request time and the database statements time
+    if timeouts and timeouts.enabled:
+        app.add_middleware(DeadlineMiddleware, limits=timeouts.default)
+
+    # Compress the responses
+    if compression and compression.enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            **compression.dict(exclude={"enabled"}),
+        )
+
     # Extend FastAPI default error handlers
     app.exception_handler(RequestValidationError)(
         pydantic_validation_errors_handler
@@ -46,10 +80,13 @@ def create(
     app.exception_handler(Exception)(python_base_error_handler)
 
     # Define startup tasks that are running asynchronous using FastAPI hook
+    # NOTE: The coroutines are created on startup, not on import.
+    #       Tasks run one by one, so the next ones can rely on
+    #       the previous ones, e.g. the warmup on the created tables.
     if startup_tasks:
-        for task in startup_tasks:
-            coro = partial(asyncio.create_task, task())
-            app.on_event("startup")(coro)
+        app.on_event("startup")(
+            partial(_run_in_background, tuple(startup_tasks))
+        )
 
     # Define shutdown tasks using FastAPI hook
     if shutdown_tasks:
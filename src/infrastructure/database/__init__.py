@@ -5,3 +5,4 @@
 from src.infrastructure.database.repository import *  # noqa: F401, F403
 from src.infrastructure.database.session import *  # noqa: F401, F403
 from src.infrastructure.database.tables import *  # noqa: F401, F403
+from src.infrastructure.database.timeouts import *  # noqa: F401, F403
@@ -0,0 +1,175 @@
+"""src/infrastructure/database/idempotency.py"""
+
+# This module includes the Idempotency-Key header support.
+# The key is stored within the same transaction as the route effects,
+# so the response is replayed only if the effects are committed.
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from functools import wraps
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import Result, delete, select
+from starlette.requests import Request
+
+from src.config import settings
+from src.infrastructure.database.repository import BaseRepository
+from src.infrastructure.database.tables import IdempotencyKeysTable
+from src.infrastructure.database.transaction import transaction
+from src.infrastructure.errors import (
+    ConflictError,
+    DatabaseError,
+    UnprocessableError,
+)
+from src.infrastructure.models import PublicModel
+
+__all__ = ("IdempotencyKeysRepository", "idempotent", "cleanup")
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+class IdempotencyKeysRepository(BaseRepository[IdempotencyKeysTable]):
+    schema_class = IdempotencyKeysTable
+
+    async def get(
+        self, scope_: str, owner_: str, key_: str
+    ) -> IdempotencyKeysTable | None:
+        result: Result = await self.execute(
+            select(self.schema_class)
+            .where(self.schema_class.scope == scope_)
+            .where(self.schema_class.owner == owner_)
+            .where(self.schema_class.key == key_)
+        )
+        return result.scalar_one_or_none()
+
+    async def claim(
+        self, scope_: str, owner_: str, key_: str, fingerprint_: str
+    ) -> IdempotencyKeysTable:
+        """Save the key before the route is executed. The concurrent
+        request with the same key fails on the unique constraint."""
+
+        return await self._save(
+            {
+                "scope": scope_,
+                "owner": owner_,
+                "key": key_,
+                "fingerprint": fingerprint_,
+                "created_at": datetime.utcnow(),
+            }
+        )
+
+    async def complete(
+        self, id_: int, status_code_: int, response_: str
+    ) -> None:
+        await self._update(
+            key="id",
+            value=id_,
+            payload={"status_code": status_code_, "response": response_},
+        )
+
+    async def delete(self, id_: int) -> None:
+        await self._delete(id_)
+
+    async def delete_expired(self) -> None:
+        await self.execute(
+            delete(self.schema_class).where(
+                self.schema_class.created_at < _expired_before()
+            )
+        )
+
+
+def _expired_before() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=settings.idempotency.ttl)
+
+
+@transaction
+async def cleanup() -> None:
+    """Remove the expired keys, it is run periodically
+    since the keys are not reused by the clients as a rule."""
+
+    await IdempotencyKeysRepository().delete_expired()
+
+
+async def _fingerprint(request: Request) -> str:
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(str(request.url.path).encode())
+    digest.update(str(request.query_params).encode())
+    digest.update(await request.body())
+
+    return digest.hexdigest()
+
+
+def idempotent(scope: str, status_code: int, owner: str = "user"):
+    """
+    This decorator should be used under the transaction decorator.
+    If the request includes the Idempotency-Key header the response
+    is stored and then it is replayed for the repeated requests
+    without the route execution.
+    The keys are separated by the owner, that is the route argument
+    with the id attribute (the current user by default).
+    """
+
+    def decorator(coro):
+        @wraps(coro)
+        async def inner(*args, **kwargs):
+            request: Request | None = next(
+                (arg for arg in kwargs.values() if isinstance(arg, Request)),
+                None,
+            )
+            if request is None or not (
+                key := request.headers.get(IDEMPOTENCY_HEADER)
+            ):
+                return await coro(*args, **kwargs)
+
+            owner_id = str(getattr(kwargs.get(owner), "id", ""))
+            fingerprint = await _fingerprint(request)
+            repository = IdempotencyKeysRepository()
+
+            if stored := await repository.get(scope, owner_id, key):
+                if stored.created_at < _expired_before():
+                    await repository.delete(stored.id)
+                elif stored.fingerprint != fingerprint:
+                    raise UnprocessableError(
+                        message=(
+                            f"{IDEMPOTENCY_HEADER} is already used "
+                            "for another request"
+                        )
+                    )
+                elif stored.response is None:
+                    raise ConflictError(
+                        message="The request is already in progress"
+                    )
+                else:
+                    return JSONResponse(
+                        json.loads(stored.response),
+                        status_code=stored.status_code,
+                    )
+
+            try:
+                claimed = await repository.claim(
+                    scope, owner_id, key, fingerprint
+                )
+            except DatabaseError:
+                raise ConflictError(
+                    message="The request is already in progress"
+                )
+
+            result = await coro(*args, **kwargs)
+
+            content = (
+                result.encoded_dict()
+                if isinstance(result, PublicModel)
+                else jsonable_encoder(result)
+            )
+            await repository.complete(
+                claimed.id, status_code, json.dumps(content)
+            )
+
+            return result
+
+        return inner
+
+    return decorator
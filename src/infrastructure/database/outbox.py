@@ -0,0 +1,180 @@
+"""src/infrastructure/database/outbox.py"""
+
+# This module includes the transactional outbox.
+# Messages are saved within the same transaction as the business changes
+# and the relay hands them over to the broker after the commit, so they
+# are neither lost on crash nor sent for the rolled back changes.
+# The delivery is at-least-once: the batch is published again
+# if the relay fails before its commit. The failed messages are retried
+# with the exponential backoff until the attempts are exhausted.
+
+import json
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from loguru import logger
+from sqlalchemy import Result, delete, or_, select, update
+
+from src.config import settings
+from src.infrastructure.database.repository import BaseRepository
+from src.infrastructure.database.tables import OutboxTable
+from src.infrastructure.database.transaction import transaction
+
+__all__ = ("OutboxRepository", "relay")
+
+
+class OutboxRepository(BaseRepository[OutboxTable]):
+    schema_class = OutboxTable
+
+    def add(self, topic_: str, payload_: dict[str, Any]) -> None:
+        """Queue the message, it is inserted with the transaction flush
+        and dispatched after the commit."""
+
+        self._queue(
+            {
+                "topic": topic_,
+                "payload": json.dumps(jsonable_encoder(payload_)),
+                "created_at": datetime.utcnow(),
+            }
+        )
+
+    async def pending(self, limit_: int) -> list[OutboxTable]:
+        """Return the oldest messages that are not dispatched yet
+        and are due to the next attempt.
+        The rows are locked on PostgreSQL so the concurrent relays
+        take different batches."""
+
+        result: Result = await self.execute(
+            select(self.schema_class)
+            .where(self.schema_class.dispatched_at.is_(None))
+            .where(self.schema_class.attempts < settings.outbox.max_attempts)
+            .where(
+                or_(
+                    self.schema_class.next_attempt_at.is_(None),
+                    self.schema_class.next_attempt_at <= datetime.utcnow(),
+                )
+            )
+            .order_by(self.schema_class.id)
+            .limit(limit_)
+            .with_for_update(skip_locked=True)
+        )
+
+        return list(result.scalars().all())
+
+    async def dispatched(self, ids_: list[int]) -> None:
+        await self.execute(
+            update(self.schema_class)
+            .where(self.schema_class.id.in_(ids_))
+            .values(
+                dispatched_at=datetime.utcnow(),
+                attempts=self.schema_class.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def failed(self, id_: int, attempts_: int) -> None:
+        """Postpone the next attempt of the message that has failed
+        attempts_ times, the delay is doubled with every attempt."""
+
+        delay = min(
+            settings.outbox.retry_delay * 2 ** (attempts_ - 1),
+            settings.outbox.max_retry_delay,
+        )
+        await self.execute(
+            update(self.schema_class)
+            .where(self.schema_class.id == id_)
+            .values(
+                attempts=attempts_,
+                next_attempt_at=datetime.utcnow() + timedelta(seconds=delay),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def delete_dispatched(self) -> None:
+        """Remove the dispatched messages and the ones that are
+        not retried anymore after the retention period."""
+
+        before = datetime.utcnow() - timedelta(
+            seconds=settings.outbox.retention
+        )
+        await self.execute(
+            delete(self.schema_class).where(
+                or_(
+                    self.schema_class.dispatched_at < before,
+                    (
+                        self.schema_class.attempts
+                        >= settings.outbox.max_attempts
+                    )
+                    & (self.schema_class.created_at < before),
+                )
+            )
+        )
+
+
+@transaction
+async def _relay_batch(
+    dispatch: Callable[[str, dict[str, Any]], None], batch_size: int
+) -> tuple[int, bool]:
+    """Dispatch the batch of messages. It is stopped on the first
+    failure, since the rest of them would fail the same way
+    if the broker is not available.
+    Return the number of the dispatched messages and if the run
+    should be stopped."""
+
+    repository = OutboxRepository()
+    messages = await repository.pending(limit_=batch_size)
+
+    sent: list[int] = []
+    failed = False
+    for message in messages:
+        try:
+            dispatch(message.topic, json.loads(message.payload))
+        except Exception as error:  # pylint: disable=W0718
+            attempts = message.attempts + 1
+            await repository.failed(id_=message.id, attempts_=attempts)
+
+            if attempts >= settings.outbox.max_attempts:
+                logger.critical(
+                    f"Outbox message {message.id} is not dispatched "
+                    f"after {attempts} attempts and is dropped: {error}"
+                )
+            else:
+                logger.error(f"Outbox message {message.id} failed: {error}")
+
+            failed = True
+            break
+
+        sent.append(message.id)
+
+    if sent:
+        await repository.dispatched(ids_=sent)
+
+    return len(sent), failed or len(messages) < batch_size
+
+
+@transaction
+async def _cleanup() -> None:
+    await OutboxRepository().delete_dispatched()
+
+
+async def relay(
+    dispatch: Callable[[str, dict[str, Any]], None], batch_size: int
+) -> int:
+    """Pass the pending messages to the dispatch callable by batches.
+    Every batch is committed separately. The run is stopped on the first
+    failure, the message is retried by one of the next runs.
+    Return the number of the dispatched messages."""
+
+    total = 0
+
+    while True:
+        dispatched, finished = await _relay_batch(dispatch, batch_size)
+        total += dispatched
+
+        if finished:
+            break
+
+    await _cleanup()
+
+    return total
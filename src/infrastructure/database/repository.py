@@ -1,18 +1,78 @@
 """src/infrastructure/database/repository.py"""
 
-from typing import Any, AsyncGenerator, Generic, Type
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    ClassVar,
+    Generic,
+    Hashable,
+    Iterable,
+    Sequence,
+    Type,
+)
 
-from sqlalchemy import Result, asc, delete, desc, func, select, update
+from sqlalchemy import (
+    ColumnElement,
+    Executable,
+    Result,
+    Row,
+    Select,
+    asc,
+    bindparam,
+    delete,
+    desc,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import joinedload, load_only, selectinload, undefer
+from sqlalchemy.orm.interfaces import ORMOption
 
 from src.infrastructure.database.session import Session
 from src.infrastructure.database.tables import ConcreteTable
 from src.infrastructure.errors import (
+    BadRequestError,
     DatabaseError,
     NotFoundError,
     UnprocessableError,
 )
+from src.infrastructure.models import _PublicModel
+
+__all__ = ("BaseRepository", "encode_cursor", "decode_cursor")
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the keyset pagination values to the opaque cursor."""
+
+    return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types: type) -> list[Any]:
+    """Decode the cursor that is created by the encode_cursor.
+    The values are checked against the given types, since the client
+    can send anything and the wrong values break the SQL."""
+
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (BinasciiError, UnicodeError, ValueError):
+        raise BadRequestError(message="Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise BadRequestError(message="Invalid cursor")
 
-__all__ = ("BaseRepository",)
+    for value, type_ in zip(values, types):
+        # NOTE: The bool is a subclass of the int in Python
+        if not isinstance(value, type_) or isinstance(value, bool):
+            raise BadRequestError(message="Invalid cursor")
+
+    return values
 
 
 # Mypy error: https://github.com/python/mypy/issues/13755
@@ -24,6 +84,10 @@ class BaseRepository(Session, Generic[ConcreteTable]):  # type: ignore
 
     schema_class: Type[ConcreteTable]
 
+    # The parameterised statements that are built once per process,
+    # only the parameters are passed on every call
+    _statements: ClassVar[dict[Hashable, Executable]] = {}
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -34,34 +98,181 @@ class BaseRepository(Session, Generic[ConcreteTable]):  # type: ignore
                 )
             )
 
+    def _statement(
+        self, key: Hashable, build: Callable[[], Executable]
+    ) -> Executable:
+        """Return the statement that is built once for the schema class
+        and the key. The statement should use bindparam() instead
+        of the values, so it is reused with any parameters."""
+
+        cache_key = (self.schema_class, key)
+
+        if (statement := self._statements.get(cache_key)) is None:
+            statement = self._statements[cache_key] = build()
+
+        return statement
+
+    @property
+    def _dialect(self) -> str:
+        """The name of the database dialect that is used by the session."""
+
+        return self._session.bind.dialect.name
+
+    def _load(self, columns: Iterable[str] | None = None) -> ORMOption:
+        """Return the loader option for the schema class.
+        If columns are not passed all of them are loaded, including
+        the deferred ones, otherwise only the given columns are loaded
+        and the access to the rest of them raises an error."""
+
+        if columns is None:
+            return undefer("*")
+
+        return load_only(
+            *(getattr(self.schema_class, column) for column in columns),
+            raiseload=True,
+        )
+
+    def _joined(
+        self, relationship: str, columns: Iterable[str] | None = None
+    ) -> ORMOption:
+        """Return the option that loads the related entity
+        in the same query using JOIN."""
+
+        option = joinedload(getattr(self.schema_class, relationship))
+        return self._related(option, relationship, columns)
+
+    def _selectin(
+        self, relationship: str, columns: Iterable[str] | None = None
+    ) -> ORMOption:
+        """Return the option that loads the related entities
+        for all the fetched rows using one additional SELECT ... IN."""
+
+        option = selectinload(getattr(self.schema_class, relationship))
+        return self._related(option, relationship, columns)
+
+    def _related(
+        self,
+        option: Any,
+        relationship: str,
+        columns: Iterable[str] | None = None,
+    ) -> ORMOption:
+        if columns is None:
+            return option.undefer("*")
+
+        related = getattr(self.schema_class, relationship).mapper.class_
+        return option.load_only(
+            *(getattr(related, column) for column in columns), raiseload=True
+        )
+
+    def _insert(self) -> sqlite.Insert | postgresql.Insert:
+        """Return the dialect specific INSERT construct
+        that supports the ON CONFLICT clause."""
+
+        if self._dialect == "postgresql":
+            return postgresql.insert(self.schema_class)
+
+        return sqlite.insert(self.schema_class)
+
     async def _update(
-        self, key: str, value: Any, payload: dict[str, Any]
+        self,
+        key: str,
+        value: Any,
+        payload: dict[str, Any],
+        columns: Iterable[str] | None = None,
+        bump_version: bool = False,
     ) -> ConcreteTable:
         """Updates an existed instance of the model in the related table.
         If some data is not exist in the payload then the null value will
-        be passed to the schema class."""
-
-        query = (
-            update(self.schema_class)
-            .where(getattr(self.schema_class, key) == value)
-            .values(payload)
-            .returning(self.schema_class)
-        )
-        result: Result = await self.execute(query)
-        await self._session.flush()
+        be passed to the schema class.
+        The version column is incremented if bump_version is set."""
+
+        if columns is not None:
+            columns = tuple(columns)
+
+        if any(isinstance(item, ColumnElement) for item in payload.values()):
+            # The SQL expressions, e.g. counters increments, are inlined
+            query = (
+                update(self.schema_class)
+                .where(getattr(self.schema_class, key) == value)
+                .values(payload)
+                .values(self._bumped(bump_version))
+                .returning(self.schema_class)
+                .options(self._load(columns))
+            )
+            result: Result = await self.execute(query)
+        else:
+            fields = tuple(sorted(payload))
+            query = self._statement(
+                ("update", key, fields, columns, bump_version),
+                lambda: (
+                    update(self.schema_class)
+                    .where(
+                        getattr(self.schema_class, key)
+                        == bindparam("where_key")
+                    )
+                    .values(
+                        {field: bindparam(f"set_{field}") for field in fields}
+                    )
+                    .values(self._bumped(bump_version))
+                    .returning(self.schema_class)
+                    .options(self._load(columns))
+                ),
+            )
+            result = await self.execute(
+                query,
+                {
+                    "where_key": value,
+                    **{f"set_{field}": payload[field] for field in fields},
+                },
+            )
 
+        # NOTE: The statement is executed immediately, there is nothing
+        #       to flush, the pending ORM changes are flushed on commit.
         if not (schema := result.scalar_one_or_none()):
             raise DatabaseError
 
         return schema
 
-    async def _get(self, key: str, value: Any) -> ConcreteTable:
+    def _bumped(self, bump_version: bool) -> dict[str, Any]:
+        """Return the version column increment for the UPDATE values."""
+
+        if not bump_version:
+            return {}
+
+        return {"version": self.schema_class.version + 1}
+
+    async def _get(
+        self,
+        key: str,
+        value: Any,
+        columns: Iterable[str] | None = None,
+        options: Iterable[ORMOption] = (),
+    ) -> ConcreteTable:
         """Return only one result by filters"""
 
-        query = select(self.schema_class).where(
-            getattr(self.schema_class, key) == value
-        )
-        result: Result = await self.execute(query)
+        if options:
+            query = (
+                select(self.schema_class)
+                .where(getattr(self.schema_class, key) == value)
+                .options(self._load(columns), *options)
+            )
+            result: Result = await self.execute(query)
+        else:
+            if columns is not None:
+                columns = tuple(columns)
+
+            query = self._statement(
+                ("get", key, columns),
+                lambda: (
+                    select(self.schema_class)
+                    .where(
+                        getattr(self.schema_class, key)
+                        == bindparam("where_key")
+                    )
+                    .options(self._load(columns))
+                ),
+            )
+            result = await self.execute(query, {"where_key": value})
 
         if not (_result := result.scalars().one_or_none()):
             raise NotFoundError
@@ -86,7 +297,10 @@ class BaseRepository(Session, Generic[ConcreteTable]):  # type: ignore
 
     async def _first(self, by: str = "id") -> ConcreteTable:
         result: Result = await self.execute(
-            select(self.schema_class).order_by(asc(by)).limit(1)
+            select(self.schema_class)
+            .options(self._load())
+            .order_by(asc(by))
+            .limit(1)
         )
 
         if not (_result := result.scalar_one_or_none()):
@@ -96,7 +310,10 @@ class BaseRepository(Session, Generic[ConcreteTable]):  # type: ignore
 
     async def _last(self, by: str = "id") -> ConcreteTable:
         result: Result = await self.execute(
-            select(self.schema_class).order_by(desc(by)).limit(1)
+            select(self.schema_class)
+            .options(self._load())
+            .order_by(desc(by))
+            .limit(1)
         )
 
         if not (_result := result.scalar_one_or_none()):
@@ -105,32 +322,259 @@ class BaseRepository(Session, Generic[ConcreteTable]):  # type: ignore
         return _result
 
     async def _save(self, payload: dict[str, Any]) -> ConcreteTable:
-        try:
-            schema = self.schema_class(**payload)
-            self._session.add(schema)
-            await self._session.flush()
-            await self._session.refresh(schema)
-            return schema
-        except self._ERRORS:
-            raise DatabaseError
+        """Insert the row and return it with the database defaults
+        using the single INSERT ... RETURNING statement."""
 
-    async def _all(
-        self, skip: int = 0, limit: int | None = None
-    ) -> AsyncGenerator[ConcreteTable, None]:
-        query = select(self.schema_class).offset(skip)
+        query = (
+            insert(self.schema_class)
+            .values(payload)
+            .returning(self.schema_class)
+            .options(self._load())
+        )
+        result: Result = await self.execute(query)
 
-        if limit is not None:
-            query = query.limit(limit)
+        return result.scalar_one()
 
-        result: Result = await self.execute(query)
+    async def _save_many(
+        self, payloads: Sequence[dict[str, Any]]
+    ) -> list[ConcreteTable]:
+        """Insert all the rows by batches, the rows are returned
+        in the same order."""
+
+        if not payloads:
+            return []
+
+        result: Result = await self.execute(
+            insert(self.schema_class)
+            .returning(self.schema_class, sort_by_parameter_order=True)
+            .options(self._load()),
+            list(payloads),
+        )
+
+        return list(result.scalars().all())
+
+    def _queue(self, payload: dict[str, Any]) -> None:
+        """Add the row to the session without sending it to the database.
+        All the queued rows are inserted by one flush, at least on commit,
+        so it should be used if the result is not needed right away."""
+
+        self._session.add(self.schema_class(**payload))
+
+    async def _update_many(
+        self,
+        key: str,
+        payloads: Sequence[dict[str, Any]],
+        bump_version: bool = False,
+    ) -> None:
+        """Update many rows with one executemany statement.
+        Every payload includes the key value and the same fields.
+        The version column is incremented if bump_version is set.
+        The loaded instances are not refreshed."""
+
+        if not payloads:
+            return
+
+        fields = tuple(sorted(payloads[0].keys() - {key}))
+        query = self._statement(
+            ("update_many", key, fields, bump_version),
+            lambda: (
+                update(self.schema_class.__table__)
+                .where(
+                    getattr(self.schema_class, key) == bindparam("where_key")
+                )
+                .values({field: bindparam(f"set_{field}") for field in fields})
+                .values(self._bumped(bump_version))
+            ),
+        )
+
+        await self.execute(
+            query,
+            [
+                {
+                    "where_key": payload[key],
+                    **{f"set_{field}": payload[field] for field in fields},
+                }
+                for payload in payloads
+            ],
+        )
+
+    def _filters(self, filters: dict[str, Any]) -> list[ColumnElement]:
+        """Return the equality criteria with the bound values,
+        see _page_params for the values."""
+
+        return [
+            getattr(self.schema_class, field) == bindparam(f"filter_{field}")
+            for field in filters
+        ]
+
+    def _page(
+        self,
+        key: Hashable,
+        build: Callable[[], Select],
+        limit: int | None,
+        cached: bool = True,
+    ) -> Executable:
+        """Return the list statement with the bound offset and limit.
+        The LIMIT clause is omitted if there is no limit,
+        since it can not be bound to NULL on SQLite."""
+
+        def build_page() -> Select:
+            query = build().offset(bindparam("skip"))
+            if limit is not None:
+                query = query.limit(bindparam("limit"))
+
+            return query
+
+        if not cached:
+            return build_page()
+
+        return self._statement((key, limit is None), build_page)
+
+    @staticmethod
+    def _page_params(
+        filters: dict[str, Any],
+        skip: int | None,
+        limit: int | None,
+        params: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        return {
+            **(params or {}),
+            **{f"filter_{field}": value for field, value in filters.items()},
+            "skip": skip or 0,
+            "limit": limit,
+        }
+
+    async def _all(
+        self,
+        *criteria: ColumnElement[bool],
+        filters: dict[str, Any] | None = None,
+        skip: int = 0,
+        limit: int | None = None,
+        columns: Iterable[str] | None = None,
+        options: Iterable[ORMOption] = (),
+        cache_key: Hashable | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> AsyncGenerator[ConcreteTable, None]:
+        """Return the ORM instances. The statement is built once if there
+        are no criteria and options, or if the cache_key is passed, then
+        they should depend only on the key and use bindparam() for
+        the values that are passed by params. The filters are compared
+        for equality and their values are always bound."""
+
+        if columns is not None:
+            columns = tuple(columns)
+        filters = filters or {}
+
+        query = self._page(
+            ("all", columns, tuple(filters), cache_key),
+            lambda: (
+                select(self.schema_class)
+                .where(*self._filters(filters), *criteria)
+                .options(self._load(columns), *options)
+            ),
+            limit,
+            cached=cache_key is not None or not (criteria or options),
+        )
+        result: Result = await self.execute(
+            query, self._page_params(filters, skip, limit, params)
+        )
 
         schemas = result.scalars().all()
 
         for schema in schemas:
             yield schema
 
+    def _after(self, by: str, descending: bool = False) -> ColumnElement[bool]:
+        """Return the keyset pagination criteria. The rows are ordered
+        by the column and the id, their values from the cursor are bound
+        as the after_value and after_id parameters."""
+
+        if by == "id":
+            columns, values = self.schema_class.id, bindparam("after_id")
+        else:
+            columns = tuple_(
+                getattr(self.schema_class, by), self.schema_class.id
+            )
+            values = tuple_(bindparam("after_value"), bindparam("after_id"))
+
+        return columns < values if descending else columns > values
+
+    def _ordering(self, by: str, descending: bool = False) -> list:
+        """Return the ORDER BY clauses that are used with _after."""
+
+        columns = [getattr(self.schema_class, by)]
+        if by != "id":
+            columns.append(self.schema_class.id)
+
+        return [
+            desc(column) if descending else asc(column) for column in columns
+        ]
+
+    async def _rows(
+        self,
+        fields: Iterable[str],
+        *criteria: ColumnElement[bool],
+        filters: dict[str, Any] | None = None,
+        skip: int = 0,
+        limit: int | None = None,
+        order_by: Iterable[Any] = (),
+        cache_key: Hashable | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> AsyncGenerator[Row, None]:
+        """Select only the given columns. The lightweight tuple-like
+        rows are returned instead of the ORM instances.
+        The statement is cached the same way as by _all,
+        the ordering is the part of it like the criteria."""
+
+        fields = tuple(fields)
+        filters = filters or {}
+
+        query = self._page(
+            ("rows", fields, tuple(filters), cache_key),
+            lambda: (
+                select(
+                    *(getattr(self.schema_class, field) for field in fields)
+                )
+                .where(*self._filters(filters), *criteria)
+                .order_by(*order_by)
+            ),
+            limit,
+            cached=cache_key is not None or not (criteria or order_by),
+        )
+        result: Result = await self.execute(
+            query, self._page_params(filters, skip, limit, params)
+        )
+
+        for row in result.all():
+            yield row
+
+    async def _all_public(
+        self,
+        model: Type[_PublicModel],
+        *criteria: ColumnElement[bool],
+        filters: dict[str, Any] | None = None,
+        skip: int = 0,
+        limit: int | None = None,
+        order_by: Iterable[Any] = (),
+        cache_key: Hashable | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> AsyncGenerator[_PublicModel, None]:
+        """Project rows directly into the public model, skipping
+        the internal model validation."""
+
+        async for row in self._rows(
+            model.__fields__,
+            *criteria,
+            filters=filters,
+            skip=skip,
+            limit=limit,
+            order_by=order_by,
+            cache_key=cache_key,
+            params=params,
+        ):
+            yield model.from_orm(row)
+
     async def _delete(self, id_: int) -> None:
         await self.execute(
             delete(self.schema_class).where(self.schema_class.id == id_)
         )
-        await self._session.flush()
@@ -1,47 +1,178 @@
 """src/infrastructure/database/session.py"""
 
+import asyncio
+import os
 from contextvars import ContextVar
 
-from sqlalchemy import Result
+from sqlalchemy import Result, text
 from sqlalchemy.exc import IntegrityError, PendingRollbackError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from src.config import settings
 from src.infrastructure.database.tables import Base
-from src.infrastructure.errors import DatabaseError
+from src.infrastructure.database.timeouts import statement_timeout
+from src.infrastructure.errors import (
+    DatabaseError,
+    ServiceUnavailableError,
+    UnprocessableError,
+)
 
-__all__ = ("get_session", "engine", "CTX_SESSION", "create_tables")
+__all__ = (
+    "get_session",
+    "get_engine",
+    "CTX_SESSION",
+    "SessionMiddleware",
+    "create_tables",
+    "warmup_engine",
+    "pool_status",
+    "dispose_engine",
+)
 
 
-# Definition of an asynchronous database engine
-engine: AsyncEngine = create_async_engine(
-    settings.database.url, future=True, pool_pre_ping=True, echo=False
-)
+class _Engine:
+    """Keeps the asynchronous database engine of the current process.
+    The engine is created on the first use, so nothing is connected
+    on import, and it is created again in the forked processes."""
+
+    def __init__(self) -> None:
+        self._engine: AsyncEngine | None = None
+        self._pid: int | None = None
+        self.sessionmaker: async_sessionmaker | None = None
+
+    def get(self) -> AsyncEngine:
+        if self._engine is not None and self._pid == os.getpid():
+            return self._engine
+
+        if self._engine is not None:
+            # The inherited connections belong to the parent process,
+            # they must not be closed or used by this one
+            self._engine.sync_engine.dispose(close=False)
+
+        database = settings.database
+        self._engine = create_async_engine(
+            database.url,
+            future=True,
+            pool_pre_ping=True,
+            pool_size=database.pool_size,
+            max_overflow=database.pool_max_overflow,
+            pool_timeout=database.pool_timeout,
+            pool_recycle=database.pool_recycle,
+            echo=False,
+        )
+        self._pid = os.getpid()
+        self.sessionmaker = async_sessionmaker(
+            self._engine, expire_on_commit=False, autoflush=False
+        )
+
+        return self._engine
+
+    async def dispose(self) -> None:
+        if self._engine is not None and self._pid == os.getpid():
+            await self._engine.dispose()
+
+
+_engine = _Engine()
+
+
+def get_engine() -> AsyncEngine:
+    """Return the database engine of the current process."""
+
+    return _engine.get()
 
 
 async def create_tables():
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
 
-def get_session(engine: AsyncEngine | None = engine) -> AsyncSession:
-    """Function creates and returns asynchronous database session"""
+async def warmup_engine(connections: int | None = None):
+    """Open the pool connections before the first requests come."""
+
+    engine = get_engine()
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
 
-    Session: async_sessionmaker = async_sessionmaker(
-        engine, expire_on_commit=False, autoflush=False
+    await asyncio.gather(
+        *(
+            ping()
+            for _ in range(connections or settings.database.warmup_connections)
+        )
     )
 
-    return Session()
 
+def pool_status() -> dict[str, int]:
+    """Return the connections pool counters of the current process."""
 
-CTX_SESSION: ContextVar[AsyncSession] = ContextVar(
-    "session", default=get_session()
-)
+    pool = get_engine().pool
+    counters = {
+        "size": "size",
+        "checked_in": "checkedin",
+        "checked_out": "checkedout",
+        "overflow": "overflow",
+    }
+
+    # NOTE: Not all the pool classes support the counters
+    return {
+        name: getattr(pool, method)()
+        for name, method in counters.items()
+        if hasattr(pool, method)
+    }
+
+
+async def dispose_engine():
+    """Close all the pooled connections on shutdown."""
+
+    await _engine.dispose()
+
+
+def get_session(engine: AsyncEngine | None = None) -> AsyncSession:
+    """Function creates and returns asynchronous database session"""
+
+    if engine is not None:
+        return async_sessionmaker(
+            engine, expire_on_commit=False, autoflush=False
+        )()
+
+    get_engine()
+
+    return _engine.sessionmaker()
+
+
+# NOTE: There is no default session, it is set for every request
+#       by the SessionMiddleware or by the transaction decorator.
+CTX_SESSION: ContextVar[AsyncSession] = ContextVar("session")
+
+
+class SessionMiddleware:
+    """Creates the database session for every request and closes it
+    when the response is sent. The session does not connect to the
+    database until it is used, so it is cheap for the other requests."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        session = get_session()
+        token = CTX_SESSION.set(session)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await session.close()
+            CTX_SESSION.reset(token)
 
 
 class Session:
@@ -51,11 +182,27 @@ class Session:
     _ERRORS = (IntegrityError, PendingRollbackError)
 
     def __init__(self) -> None:
-        self._session: AsyncSession = CTX_SESSION.get()
-
-    async def execute(self, query) -> Result:
         try:
-            result = await self._session.execute(query)
+            self._session: AsyncSession = CTX_SESSION.get()
+        except LookupError:
+            raise UnprocessableError(
+                message=(
+                    "The database session is not set, "
+                    "use the transaction decorator"
+                )
+            )
+
+    async def execute(
+        self, query, params: dict | list[dict] | None = None
+    ) -> Result:
+        try:
+            async with statement_timeout(self._session):
+                result = await self._session.execute(query, params)
             return result
         except self._ERRORS:
             raise DatabaseError
+        except PoolTimeoutError:
+            raise ServiceUnavailableError(
+                message="Database connection is not available",
+                retry_after=settings.timeouts.retry_after,
+            )
@@ -0,0 +1,110 @@
+"""src/infrastructure/database/single_flight.py"""
+
+# This module includes the requests coalescing for the repository reads.
+# Concurrent identical calls within one worker share one database query.
+
+import asyncio
+from collections import defaultdict
+from functools import wraps
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from pydantic import BaseModel
+
+from src.infrastructure.errors import DatabaseError, ServiceUnavailableError
+
+__all__ = ("single_flight", "single_flight_stats")
+
+_T = TypeVar("_T")
+
+# The errors that depend on the caller, e.g. its deadline or session,
+# they are not passed to the callers that share the call
+_CALLER_ERRORS = (ServiceUnavailableError, DatabaseError)
+
+
+class _Abandoned(Exception):
+    """The shared call is cancelled or failed because of its caller,
+    the waiting callers should run it again."""
+
+
+class _SingleFlight:
+    """Runs only one call per key at a time,
+    the concurrent callers wait for its result."""
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.stats: defaultdict[str, dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "coalesced": 0, "retried": 0}
+        )
+
+    async def do(
+        self, name: str, key: Hashable, call: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        while (future := self._calls.get(key)) is not None:
+            self.stats[name]["coalesced"] += 1
+
+            try:
+                result = await asyncio.shield(future)
+            except _Abandoned:
+                # NOTE: The key is released by the previous caller,
+                #       the first of the waiting callers runs the call
+                #       and the rest of them wait for it again
+                self.stats[name]["retried"] += 1
+                continue
+
+            # Callers must not share the mutable models
+            return result.copy() if isinstance(result, BaseModel) else result
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.stats[name]["calls"] += 1
+
+        try:
+            result = await call()
+        except (asyncio.CancelledError, *_CALLER_ERRORS):
+            self._fail(future, _Abandoned())
+            raise
+        except Exception as error:
+            self._fail(future, error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    @staticmethod
+    def _fail(future: asyncio.Future, error: BaseException) -> None:
+        future.set_exception(error)
+        # Mark the exception as retrieved if there are no waiters
+        future.exception()
+
+
+_group = _SingleFlight()
+
+
+def single_flight(method):
+    """
+    This decorator coalesces the concurrent repository calls
+    with the same arguments. The query is executed within the session
+    of the first caller, so it should be used only for reads that
+    do not depend on the uncommitted changes of the caller.
+    If the first caller is cancelled or fails because of its deadline
+    or session, the waiting callers run the call again.
+    """
+
+    name = method.__qualname__
+
+    @wraps(method)
+    async def inner(self, *args, **kwargs):
+        key = (name, args, tuple(sorted(kwargs.items())))
+        return await _group.do(
+            name, key, lambda: method(self, *args, **kwargs)
+        )
+
+    return inner
+
+
+def single_flight_stats() -> dict[str, dict[str, Any]]:
+    """Return the number of executed and coalesced calls per method."""
+
+    return {name: dict(stats) for name, stats in _group.stats.items()}
@@ -1,16 +1,23 @@
 """src/infrastructure/database/tables.py"""
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import TypeVar
 
 from sqlalchemy import (
+    DDL,
     Boolean,
+    Date,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     MetaData,
     String,
+    Text,
+    UniqueConstraint,
+    event,
+    text,
 )
 from sqlalchemy.orm import (
     Mapped,
@@ -21,7 +28,17 @@ from sqlalchemy.orm import (
 
 from src.domain.constants import OrderStatus
 
-__all__ = ("UsersTable", "ProductsTable", "OrdersTable")
+__all__ = (
+    "UsersTable",
+    "ProductsTable",
+    "OrdersTable",
+    "OrdersArchiveTable",
+    "SalesDailyTable",
+    "OrdersStatusCountsTable",
+    "IdempotencyKeysTable",
+    "OutboxTable",
+    "PRODUCTS_SEARCH_TABLE",
+)
 
 meta = MetaData(
     naming_convention={
@@ -55,10 +72,21 @@ class UsersTable(Base):
     phone_number: Mapped[str] = mapped_column(
         String(length=16), nullable=False
     )
-    password: Mapped[str] = mapped_column(String(length=1024), nullable=False)
+    # NOTE: Large columns are deferred and loaded only on demand
+    password: Mapped[str] = mapped_column(
+        String(length=1024),
+        nullable=False,
+        deferred=True,
+        deferred_raiseload=True,
+    )
     first_name: Mapped[str] = mapped_column(String(length=100), nullable=True)
     last_name: Mapped[str] = mapped_column(String(length=100), nullable=True)
-    address: Mapped[str] = mapped_column(String(length=1024), nullable=False)
+    address: Mapped[str] = mapped_column(
+        String(length=1024),
+        nullable=False,
+        deferred=True,
+        deferred_raiseload=True,
+    )
     is_manager: Mapped[bool] = mapped_column(Boolean, default=False)
 
     orders = relationship("OrdersTable", back_populates="user")
@@ -68,22 +96,92 @@ class ProductsTable(Base):
     """Class creates a product table in the database"""
 
     __tablename__ = "products"
+    __table_args__ = (
+        # Used by the products list sorting by price
+        # with the keyset pagination that also orders by id
+        Index("ix_products_price_id", "price", "id"),
+        Index(
+            "ix_products_in_stock_price_id",
+            "price",
+            "id",
+            sqlite_where=text("amount > 0"),
+            postgresql_where=text("amount > 0"),
+        ),
+        Index(
+            "ix_products_in_stock_name",
+            "name",
+            sqlite_where=text("amount > 0"),
+            postgresql_where=text("amount > 0"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(
         String(length=100), unique=True, nullable=False
     )
-    title: Mapped[str] = mapped_column(String(length=1024), nullable=False)
+    title: Mapped[str] = mapped_column(
+        String(length=1024),
+        nullable=False,
+        deferred=True,
+        deferred_raiseload=True,
+    )
     price: Mapped[int] = mapped_column(Integer, nullable=False)
     amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Incremented on every update, used for the HTTP caching
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
 
     order = relationship("OrdersTable", back_populates="product")
 
 
+# NOTE: The products full-text search index can not be described
+#       as a declarative table since it is dialect specific.
+#       It is created (and filled with the existed products)
+#       after every `create_all` so it is safe to run it many times.
+PRODUCTS_SEARCH_TABLE = "products_search"
+
+for statement in (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {PRODUCTS_SEARCH_TABLE} "
+    "USING fts5(name, title)",
+    f"INSERT INTO {PRODUCTS_SEARCH_TABLE} (rowid, name, title) "
+    "SELECT id, name, title FROM products "
+    f"WHERE id NOT IN (SELECT rowid FROM {PRODUCTS_SEARCH_TABLE})",
+):
+    event.listen(
+        Base.metadata,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+
+for statement in (
+    f"CREATE TABLE IF NOT EXISTS {PRODUCTS_SEARCH_TABLE} ("
+    "product_id INTEGER PRIMARY KEY REFERENCES products (id) "
+    "ON DELETE CASCADE, document TSVECTOR NOT NULL)",
+    f"CREATE INDEX IF NOT EXISTS ix_{PRODUCTS_SEARCH_TABLE}_document "
+    f"ON {PRODUCTS_SEARCH_TABLE} USING GIN (document)",
+    f"INSERT INTO {PRODUCTS_SEARCH_TABLE} (product_id, document) "
+    "SELECT id, setweight(to_tsvector('simple', name), 'A') "
+    "|| setweight(to_tsvector('simple', title), 'B') FROM products "
+    "ON CONFLICT DO NOTHING",
+):
+    event.listen(
+        Base.metadata,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+
+
 class OrdersTable(Base):
     """Class creates a product table in the database"""
 
     __tablename__ = "orders"
+    __table_args__ = (
+        # Used by the pending orders expiration
+        Index("ix_orders_status_order_date", "status", "order_date"),
+        # Ids of the archived orders must not be reused
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     product_id: Mapped[int] = mapped_column(
@@ -104,6 +202,108 @@ class OrdersTable(Base):
         Enum(OrderStatus), nullable=False, default=OrderStatus.PENDING
     )
     order_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # The product price at the payment time, the revenue is counted by it
+    price: Mapped[int] = mapped_column(Integer, nullable=True)
+    # Incremented on every update, used for the optimistic concurrency
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
 
     user = relationship("UsersTable", back_populates="orders")
     product = relationship("ProductsTable", back_populates="order")
+
+
+class OrdersArchiveTable(Base):
+    """Class creates an archive table for the finished orders.
+    The orders keep their ids, the references are not enforced
+    since the archive outlives the users and products."""
+
+    __tablename__ = "orders_archive"
+    __table_args__ = (
+        Index("ix_orders_archive_user_id_order_date", "user_id", "order_date"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=False
+    )
+    product_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    delivery_address: Mapped[str] = mapped_column(
+        String(length=1024), nullable=True
+    )
+    status: Mapped[Enum] = mapped_column(Enum(OrderStatus), nullable=False)
+    order_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    price: Mapped[int] = mapped_column(Integer, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class SalesDailyTable(Base):
+    """Class creates a daily sales rollup table in the database"""
+
+    __tablename__ = "sales_daily"
+    __table_args__ = (UniqueConstraint("product_id", "day"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    product_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    amount: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    revenue: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class OrdersStatusCountsTable(Base):
+    """Class creates an orders per status rollup table in the database"""
+
+    __tablename__ = "orders_status_counts"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    status: Mapped[Enum] = mapped_column(
+        Enum(OrderStatus), unique=True, nullable=False
+    )
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class IdempotencyKeysTable(Base):
+    """Class creates an idempotency keys table in the database"""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("scope", "owner", "key"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    scope: Mapped[str] = mapped_column(String(length=100), nullable=False)
+    owner: Mapped[str] = mapped_column(String(length=100), nullable=False)
+    key: Mapped[str] = mapped_column(String(length=255), nullable=False)
+    # The hash of the request that is used to detect the keys reusing
+    fingerprint: Mapped[str] = mapped_column(String(length=64), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=True)
+    response: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, index=True
+    )
+
+
+class OutboxTable(Base):
+    """Class creates a transactional outbox table in the database"""
+
+    __tablename__ = "outbox"
+    __table_args__ = (
+        # Only the messages that are not dispatched yet are scanned
+        Index(
+            "ix_outbox_pending_id",
+            "id",
+            sqlite_where=text("dispatched_at IS NULL"),
+            postgresql_where=text("dispatched_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    topic: Mapped[str] = mapped_column(String(length=100), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    dispatched_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=True, index=True
+    )
+    # The failed message is not retried before this time
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
@@ -0,0 +1,178 @@
+"""src/infrastructure/database/timeouts.py"""
+
+# This module includes the request deadlines and the statement timeouts.
+# The DeadlineMiddleware sets the default ones for every request and
+# the `timeout` decorator overrides them for the route. The database
+# session reads them from the context before every statement, so a slow
+# query is aborted and its connection goes back to the pool instead of
+# being held until the client gives up.
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import AsyncIterator
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import TimeoutSettings, settings
+from src.infrastructure.errors import ServiceUnavailableError
+
+__all__ = (
+    "CTX_DEADLINE",
+    "CTX_STATEMENT_TIMEOUT",
+    "DeadlineMiddleware",
+    "timeout",
+    "statement_timeout",
+)
+
+
+# The monotonic time when the request has to be finished
+CTX_DEADLINE: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+# Seconds that a single statement is allowed to run
+CTX_STATEMENT_TIMEOUT: ContextVar[float | None] = ContextVar(
+    "statement_timeout", default=None
+)
+
+
+def _unavailable(message: str) -> ServiceUnavailableError:
+    return ServiceUnavailableError(
+        message=message, retry_after=settings.timeouts.retry_after
+    )
+
+
+def _remaining() -> float | None:
+    """Return seconds that the next statement is allowed to run,
+    None if it is not limited."""
+
+    deadline = CTX_DEADLINE.get()
+    statement = CTX_STATEMENT_TIMEOUT.get()
+
+    if deadline is None:
+        return statement
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise _unavailable("Request deadline is exceeded")
+
+    return remaining if statement is None else min(remaining, statement)
+
+
+def _set(limits: TimeoutSettings) -> tuple:
+    deadline = CTX_DEADLINE.get()
+    if limits.deadline is not None:
+        new_deadline = time.monotonic() + limits.deadline
+        deadline = (
+            new_deadline if deadline is None else min(deadline, new_deadline)
+        )
+
+    return (
+        CTX_DEADLINE.set(deadline),
+        CTX_STATEMENT_TIMEOUT.set(limits.statement),
+    )
+
+
+def _reset(tokens: tuple) -> None:
+    deadline_token, statement_token = tokens
+    CTX_STATEMENT_TIMEOUT.reset(statement_token)
+    CTX_DEADLINE.reset(deadline_token)
+
+
+def timeout(limits: TimeoutSettings):
+    """
+    This decorator overrides the default request limits for the route.
+    It should be placed above the transaction decorator.
+    """
+
+    def decorator(coro):
+        @wraps(coro)
+        async def inner(*args, **kwargs):
+            if not settings.timeouts.enabled:
+                return await coro(*args, **kwargs)
+
+            tokens = _set(limits)
+            try:
+                return await coro(*args, **kwargs)
+            finally:
+                _reset(tokens)
+
+        return inner
+
+    return decorator
+
+
+class DeadlineMiddleware:
+    """Sets the default deadline and statement timeout
+    for every request."""
+
+    def __init__(self, app: ASGIApp, limits: TimeoutSettings) -> None:
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tokens = _set(self.limits)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _reset(tokens)
+
+
+@asynccontextmanager
+async def statement_timeout(session: AsyncSession) -> AsyncIterator[None]:
+    """Abort the statement that is executed within the context if it
+    exceeds the statement timeout or the request deadline and raise
+    the ServiceUnavailableError instead."""
+
+    seconds = _remaining()
+    if seconds is None:
+        yield
+        return
+
+    # Waiting for the pool connection is limited by the deadline too
+    try:
+        async with asyncio.timeout(seconds):
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+    except TimeoutError as error:
+        raise _unavailable("Database connection is not available") from error
+
+    interrupt = getattr(raw_connection.driver_connection, "interrupt", None)
+
+    if interrupt is None:
+        # NOTE: Only the awaiting is cancelled for the drivers
+        #       that can not interrupt the running statement
+        try:
+            async with asyncio.timeout(seconds):
+                yield
+        except TimeoutError as error:
+            raise _unavailable("Database query timed out") from error
+        return
+
+    # NOTE: SQLite runs the statement in the driver thread, cancelling
+    #       the awaiting leaves it running and the connection busy.
+    #       The interrupt aborts it and the driver raises the error.
+    loop = asyncio.get_running_loop()
+    interrupted = False
+
+    def fire() -> None:
+        nonlocal interrupted
+        interrupted = True
+        loop.create_task(interrupt())
+
+    handle = loop.call_later(seconds, fire)
+    try:
+        yield
+    except OperationalError as error:
+        if interrupted:
+            raise _unavailable("Database query timed out") from error
+        raise
+    finally:
+        handle.cancel()
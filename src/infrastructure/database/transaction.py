@@ -18,8 +18,15 @@ def transaction(coro):
 
     @wraps(coro)
     async def inner(*args, **kwargs):
-        session: AsyncSession = get_session()
-        CTX_SESSION.set(session)
+        # NOTE: The request session (see SessionMiddleware) is reused,
+        #       otherwise, e.g. in the background tasks, the session
+        #       is owned by the transaction and closed after it.
+        session: AsyncSession | None = CTX_SESSION.get(None)
+        token = None
+
+        if session is None:
+            session = get_session()
+            token = CTX_SESSION.set(session)
 
         try:
             result = await coro(*args, **kwargs)
@@ -41,6 +48,8 @@ def transaction(coro):
             logger.error(f"Rolling back changes.\n{error}")
             await session.rollback()
         finally:
-            await session.close()
+            if token is not None:
+                await session.close()
+                CTX_SESSION.reset(token)
 
     return inner
@@ -15,6 +15,9 @@ __all__ = (
     "DatabaseError",
     "AuthenticationError",
     "AuthorizationError",
+    "TooManyRequestsError",
+    "ConflictError",
+    "ServiceUnavailableError",
 )
 
 
@@ -26,9 +29,11 @@ class BaseError(Exception):
         *_: tuple[Any],
         message: str = "",
         status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
+        headers: dict[str, str] | None = None,
     ) -> None:
         self.message: str = message
         self.status_code: int = status_code
+        self.headers: dict[str, str] | None = headers
 
         super().__init__(message)
 
@@ -96,3 +101,42 @@ class AuthorizationError(BaseError):
         super().__init__(
             message=message, status_code=status.HTTP_403_FORBIDDEN
         )
+
+
+class ConflictError(BaseError):
+    """Conflict Error class"""
+
+    def __init__(self, *_: tuple[Any], message: str = "Conflict") -> None:
+        super().__init__(message=message, status_code=status.HTTP_409_CONFLICT)
+
+
+class TooManyRequestsError(BaseError):
+    """Too Many Requests Error class"""
+
+    def __init__(
+        self,
+        *_: tuple[Any],
+        message: str = "Too many requests",
+        retry_after: int = 1,
+    ) -> None:
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class ServiceUnavailableError(BaseError):
+    """Service Unavailable Error class"""
+
+    def __init__(
+        self,
+        *_: tuple[Any],
+        message: str = "Service unavailable",
+        retry_after: int = 1,
+    ) -> None:
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -0,0 +1,4 @@
+"""src/infrastructure/http/__init__.py"""
+
+from src.infrastructure.http.caching import *  # noqa: F401, F403
+from src.infrastructure.http.compression import *  # noqa: F401, F403
@@ -0,0 +1,54 @@
+"""src/infrastructure/http/caching.py"""
+
+# This module includes the HTTP caching utils: ETag and Cache-Control.
+
+import hashlib
+from typing import Any
+
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+__all__ = (
+    "make_etag",
+    "is_not_modified",
+    "cache_headers",
+    "not_modified",
+)
+
+
+def make_etag(*parts: Any) -> str:
+    """Return the strong ETag that is based on the given values."""
+
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Check if the If-None-Match request header matches the ETag."""
+
+    if not (header := request.headers.get("if-none-match")):
+        return False
+
+    if header.strip() == "*":
+        return True
+
+    return etag in (
+        tag.strip().removeprefix("W/") for tag in header.split(",")
+    )
+
+
+def cache_headers(etag: str, max_age: int) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+    }
+
+
+def not_modified(etag: str, max_age: int) -> Response:
+    """The empty response that is returned without the body serialization."""
+
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=cache_headers(etag, max_age),
+    )
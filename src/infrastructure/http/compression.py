@@ -0,0 +1,279 @@
+"""src/infrastructure/http/compression.py"""
+
+# This module includes the responses compression ASGI middleware.
+# The gzip encoding is always available, brotli and zstd are used
+# only if the related packages are installed.
+
+import zlib
+from functools import partial
+from typing import Callable, Protocol, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+__all__ = ("CompressionMiddleware",)
+
+
+# Content types that are worth to compress
+_COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+)
+_COMPRESSIBLE_SUFFIXES = ("+json", "+xml")
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        """Return all the data that is compressed so far,
+        the stream can be continued after it."""
+
+    def finish(self) -> bytes:
+        """Return the rest of the data and close the stream."""
+
+
+class _GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(
+            level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """Compress the responses with the best encoding that is accepted
+    by the client. Responses smaller than minimum_size are sent as is.
+    Streaming responses stay streaming: every chunk is compressed
+    and flushed separately.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings: Sequence[str] = ("zstd", "br", "gzip"),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+        available: dict[str, Callable[[], _Compressor] | None] = {
+            "gzip": partial(_GzipCompressor, gzip_level),
+            "br": brotli and partial(_BrotliCompressor, brotli_quality),
+            "zstd": zstandard and partial(_ZstdCompressor, zstd_level),
+        }
+        # The order defines the server preference
+        self.compressors: dict[str, Callable[[], _Compressor]] = {
+            encoding: factory
+            for encoding in encodings
+            if (factory := available.get(encoding))
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        if not (encoding := self._choose(accept)):
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(
+            send=send,
+            encoding=encoding,
+            compressor=self.compressors[encoding],
+            minimum_size=self.minimum_size,
+        )
+        await self.app(scope, receive, responder.send)
+
+    def _choose(self, accept: str) -> str | None:
+        """Return the preferred encoding that is accepted by the client."""
+
+        accepted: set[str] = set()
+        for item in accept.split(","):
+            encoding, _, params = item.strip().partition(";")
+            quality = params.strip().removeprefix("q=")
+            try:
+                if quality and float(quality) <= 0:
+                    continue
+            except ValueError:
+                continue
+            accepted.add(encoding.strip().lower())
+
+        for encoding in self.compressors:
+            if encoding in accepted or "*" in accepted:
+                return encoding
+
+        return None
+
+
+class _CompressionResponder:
+    """Wraps the ASGI send callable for the single response."""
+
+    def __init__(
+        self,
+        send: Send,
+        encoding: str,
+        compressor: Callable[[], _Compressor],
+        minimum_size: int,
+    ) -> None:
+        self._send = send
+        self._encoding = encoding
+        self._factory = compressor
+        self._minimum_size = minimum_size
+
+        self._start: Message | None = None
+        self._compressor: _Compressor | None = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Headers depend on the body, so they are delayed
+            self._start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self._start is not None:
+            await self._begin(message)
+            return
+
+        if self._compressor is None:
+            await self._send(message)
+            return
+
+        more_body = message.get("more_body", False)
+        body = self._compressor.compress(message.get("body", b""))
+        body += (
+            self._compressor.flush()
+            if more_body
+            else self._compressor.finish()
+        )
+
+        await self._send(
+            {
+                "type": "http.response.body",
+                "body": body,
+                "more_body": more_body,
+            }
+        )
+
+    async def _begin(self, message: Message) -> None:
+        """Decide if the response is compressed by the first body chunk."""
+
+        start, self._start = self._start, None
+        headers = MutableHeaders(raw=start["headers"])
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if not self._compressible(start["status"], headers):
+            if start["status"] == 304:
+                # The validator must match the compressed representation
+                _weaken_etag(headers)
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+
+        if not more_body and len(body) < self._minimum_size:
+            await self._send(start)
+            await self._send(message)
+            return
+
+        self._compressor = self._factory()
+        headers["Content-Encoding"] = self._encoding
+        _weaken_etag(headers)
+
+        if more_body:
+            # The length is unknown until the stream is finished
+            del headers["Content-Length"]
+            body = self._compressor.compress(body) + self._compressor.flush()
+        else:
+            body = self._compressor.compress(body) + self._compressor.finish()
+            headers["Content-Length"] = str(len(body))
+
+        await self._send(start)
+        await self._send(
+            {
+                "type": "http.response.body",
+                "body": body,
+                "more_body": more_body,
+            }
+        )
+
+    @staticmethod
+    def _compressible(status_code: int, headers: MutableHeaders) -> bool:
+        if status_code < 200 or status_code in (204, 304):
+            return False
+
+        if "content-encoding" in headers:
+            return False
+
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+
+        return content_type.startswith(_COMPRESSIBLE_TYPES) or (
+            content_type.endswith(_COMPRESSIBLE_SUFFIXES)
+        )
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    """The compressed body is not byte-for-byte the same as the one
+    the strong ETag is computed for, so it is weakened."""
+
+    if (etag := headers.get("etag")) and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
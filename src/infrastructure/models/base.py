@@ -2,10 +2,11 @@
 
 # This model includes basic data models that are used in the whole application.
 
-import json
+from enum import Enum
+from functools import lru_cache
 
 # import numpy as np
-from typing import TypeVar
+from typing import Any, ClassVar, TypeVar
 
 from pydantic import BaseModel, Extra
 
@@ -18,8 +19,12 @@ __all__ = (
 )
 
 
+@lru_cache(maxsize=None)
 def to_camelcase(string: str) -> str:
-    """The alias generator for PublicModel."""
+    """The alias generator for PublicModel.
+    Results are cached since the same field names are shared
+    between many public models.
+    """
 
     resp = "".join(
         word.capitalize() if index else word
@@ -33,6 +38,48 @@ _json_encoders = {
     # np.float32: lambda v: float(v) if v else None,
 }
 
+# Types that are already allowed by JSON format
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+def _encode(value: Any, by_alias: bool) -> Any:
+    """Convert the value to the JSON primitives without
+    the intermediate JSON string.
+    """
+
+    if isinstance(value, _PRIMITIVES):
+        return value
+
+    if isinstance(value, BaseModel):
+        aliases: dict[str, str] = (
+            value.__aliases__
+            if isinstance(value, PublicModel)
+            else {
+                name: field.alias for name, field in value.__fields__.items()
+            }
+        )
+        return {
+            (aliases.get(name, name) if by_alias else name): _encode(
+                item, by_alias
+            )
+            for name, item in value.__dict__.items()
+        }
+
+    if isinstance(value, Enum):
+        return _encode(value.value, by_alias)
+
+    if isinstance(value, dict):
+        return {
+            _encode(key, by_alias): _encode(item, by_alias)
+            for key, item in value.items()
+        }
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_encode(item, by_alias) for item in value]
+
+    # datetime, UUID, Decimal, etc. are encoded as the .json() does
+    return _encode(PublicModel.__json_encoder__(value), by_alias)
+
 
 class FrozenModel(BaseModel):
     """Frozen Serializer Model"""
@@ -65,6 +112,9 @@ _InternalModel = TypeVar("_InternalModel", bound=InternalModel)
 class PublicModel(BaseModel):
     """Public Serializer Model"""
 
+    # The field name -> alias table that is computed once per model class
+    __aliases__: ClassVar[dict[str, str]] = {}
+
     class Config:
         json_encoders = _json_encoders
         extra = Extra.ignore
@@ -75,13 +125,20 @@ class PublicModel(BaseModel):
         allow_population_by_field_name = True
         arbitrary_types_allowed = True
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.__aliases__ = {
+            name: field.alias for name, field in cls.__fields__.items()
+        }
+
     def encoded_dict(self, by_alias=True):
         """This method might be useful is the data should be passed
         only with primitives that are allowed by JSON format.
         The regular .dict() does not return the ISO datetime format
-        but the .json() - does. This method is a combination of them.
+        but the .json() - does. This method is a combination of them
+        that does not dump and load the JSON string.
         """
-        return json.loads(self.json(by_alias=by_alias))
+        return _encode(self, by_alias)
 
 
 _PublicModel = TypeVar("_PublicModel", bound=PublicModel)
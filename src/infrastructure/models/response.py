@@ -10,6 +10,7 @@ from src.infrastructure.models.base import PublicModel, _PublicModel
 
 __all__ = (
     "ResponseMulti",
+    "ResponseCursor",
     "Response",
     "_Response",
     "ErrorResponse",
@@ -23,6 +24,14 @@ class ResponseMulti(PublicModel, GenericModel, Generic[_PublicModel]):
     result: list[_PublicModel]
 
 
+class ResponseCursor(PublicModel, GenericModel, Generic[_PublicModel]):
+    """Generic response model that consist multiple results
+    and the cursor that is used to get the next page."""
+
+    result: list[_PublicModel]
+    cursor: str | None = None
+
+
 class Response(PublicModel, GenericModel, Generic[_PublicModel]):
     """Generic response model that consist only one result."""
 
@@ -0,0 +1,3 @@
+"""src/infrastructure/rate_limiting/__init__.py"""
+
+from src.infrastructure.rate_limiting.buckets import *  # noqa: F401, F403
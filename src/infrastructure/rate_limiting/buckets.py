@@ -0,0 +1,129 @@
+"""src/infrastructure/rate_limiting/buckets.py"""
+
+# This module includes the token bucket rate limiting backends.
+# The in-process backend limits requests within one worker,
+# the Redis backend shares the buckets between all the workers.
+
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from loguru import logger
+
+from src.config import settings
+
+__all__ = (
+    "RateLimitBackend",
+    "MemoryBackend",
+    "RedisBackend",
+    "get_rate_limit_backend",
+)
+
+
+class RateLimitBackend(Protocol):
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take one token from the bucket.
+        Return 0 if the token is taken, otherwise the number of seconds
+        the client should wait before the next attempt."""
+
+
+class MemoryBackend:
+    """The in-process token buckets. The least recently used buckets
+    are dropped when there are more than max_keys of them."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self._max_keys:
+            self._buckets.popitem(last=False)
+
+        return retry_after
+
+
+class RedisBackend:
+    """The token buckets that are stored in Redis.
+    The bucket is updated atomically by the Lua script."""
+
+    _SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or burst
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + (now - updated) * rate)
+
+    local retry_after = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        retry_after = (1 - tokens) / rate
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+
+    return tostring(retry_after)
+    """
+
+    def __init__(self, url: str, timeout: float | None = None) -> None:
+        # Imported here since the Redis client is required only
+        # if the Redis backend is configured
+        from redis.asyncio import from_url
+        from redis.exceptions import RedisError
+
+        self._errors = (RedisError, OSError)
+        self._redis = from_url(
+            url, socket_timeout=timeout, socket_connect_timeout=timeout
+        )
+        self._script = self._redis.register_script(self._SCRIPT)
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        try:
+            result = await self._script(
+                keys=[f"rate_limit:{key}"], args=[rate, burst]
+            )
+        except self._errors as error:
+            # NOTE: The rate limiting fails open, the unavailable Redis
+            #       must not take down the routes it protects
+            logger.warning(f"Rate limiting is skipped: {error!r}")
+            return 0.0
+
+        return float(result)
+
+
+_backend: RateLimitBackend | None = None
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    """Return the backend that is configured by the settings.
+    It is created once per process."""
+
+    global _backend
+
+    if _backend is None:
+        _backend = (
+            RedisBackend(
+                settings.rate_limit.redis_url,
+                timeout=settings.rate_limit.redis_timeout,
+            )
+            if settings.rate_limit.redis_url
+            else MemoryBackend()
+        )
+
+    return _backend
@@ -1,9 +1,9 @@
 """src/main.py"""
 
-import uvicorn
 from fastapi import FastAPI
 from loguru import logger
 
+from src.application import health
 from src.config import settings
 from src.infrastructure import application, database
 from src.presentation import rest
@@ -28,6 +28,12 @@ logger.add(
 
 # Adjust the application
 # -------------------------------
+startup_tasks = [health.warmup]
+
+# NOTE: The production server creates tables once before the workers start
+if settings.database.create_tables:
+    startup_tasks.insert(0, database.create_tables)
+
 app: FastAPI = application.create(
     debug=settings.debug,
     rest_routers=(
@@ -35,11 +41,19 @@ app: FastAPI = application.create(
         rest.authentication.router,
         rest.products.router,
         rest.orders.router,
+        rest.analytics.router,
+        rest.health.router,
     ),
-    startup_tasks=[database.create_tables],
-    shutdown_tasks=[],
+    compression=settings.compression,
+    timeouts=settings.timeouts,
+    startup_tasks=startup_tasks,
+    shutdown_tasks=[database.dispose_engine],
 )
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    # NOTE: This is the development server,
+    #       use `python -m src.server` in production
+    import uvicorn
+
+    uvicorn.run(app, host=settings.server.host, port=settings.server.port)
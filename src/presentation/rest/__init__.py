@@ -1,6 +1,8 @@
 """src/presentation/rest/__init__.py"""
 
+from src.presentation.rest import analytics  # noqa: F401, F403
 from src.presentation.rest import authentication  # noqa: F401, F403
+from src.presentation.rest import health  # noqa: F401, F403
 from src.presentation.rest import orders  # noqa: F401, F403
 from src.presentation.rest import products  # noqa: F401, F403
 from src.presentation.rest import users  # noqa: F401, F403
@@ -0,0 +1,106 @@
+"""src/presentation/rest/analytics.py"""
+
+from datetime import date
+
+from fastapi import APIRouter, Depends, Request, status
+
+from src.application.authentication import RoleRequired
+from src.config import settings
+from src.domain.analytics import (
+    OrdersStatusCountsRepository,
+    ProductDailySalesPublic,
+    SalesDailyRepository,
+    StatusCountPublic,
+    TopSellerPublic,
+)
+from src.domain.users import UserIdentity
+from src.infrastructure.database import timeout
+from src.infrastructure.database.transaction import transaction
+from src.infrastructure.models import ResponseMulti
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+@router.get("/revenue", status_code=status.HTTP_200_OK)
+@timeout(settings.timeouts.analytics)
+@transaction
+async def revenue_daily(
+    _: Request,
+    since: date | None = None,
+    until: date | None = None,
+    product_id: int | None = None,
+    skip: int = 0,
+    limit: int | None = None,
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
+) -> ResponseMulti[ProductDailySalesPublic]:
+    """Get revenue per product per day, only managers"""
+
+    # Get sales from the daily rollup
+    sales = [
+        item
+        async for item in SalesDailyRepository().daily(
+            since_=since,
+            until_=until,
+            product_id_=product_id,
+            skip_=skip,
+            limit_=limit,
+        )
+    ]
+
+    return ResponseMulti[ProductDailySalesPublic](result=sales)
+
+
+@router.get("/top_sellers", status_code=status.HTTP_200_OK)
+@timeout(settings.timeouts.analytics)
+@transaction
+async def top_sellers(
+    _: Request,
+    since: date | None = None,
+    until: date | None = None,
+    limit: int = 10,
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
+) -> ResponseMulti[TopSellerPublic]:
+    """Get the most sold products, only managers"""
+
+    # Get top sellers from the daily rollup
+    sellers = [
+        item
+        async for item in SalesDailyRepository().top_sellers(
+            since_=since, until_=until, limit_=limit
+        )
+    ]
+
+    return ResponseMulti[TopSellerPublic](result=sellers)
+
+
+@router.get("/statuses", status_code=status.HTTP_200_OK)
+@timeout(settings.timeouts.analytics)
+@transaction
+async def orders_per_status(
+    _: Request,
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
+) -> ResponseMulti[StatusCountPublic]:
+    """Get orders number per status, only managers"""
+
+    # Get counters from the status rollup
+    counts = [item async for item in OrdersStatusCountsRepository().all()]
+
+    return ResponseMulti[StatusCountPublic](result=counts)
+
+
+@router.put("/rebuild", status_code=status.HTTP_202_ACCEPTED)
+@timeout(settings.timeouts.analytics)
+@transaction
+async def rollups_rebuild(
+    _: Request,
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
+) -> ResponseMulti[StatusCountPublic]:
+    """Recompute the analytics from the orders history, only managers"""
+
+    # Rebuild rollups from the orders table
+    await SalesDailyRepository().rebuild()
+    await OrdersStatusCountsRepository().rebuild()
+
+    counts = [item async for item in OrdersStatusCountsRepository().all()]
+
+    return ResponseMulti[StatusCountPublic](result=counts)
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
 
 from src.application.authentication import create_access_token
+from src.application.rate_limiting import RateLimit
 from src.config import settings
 from src.domain.users import UsersRepository
 from src.infrastructure.errors import NotFoundError
@@ -11,12 +12,18 @@ from src.infrastructure.errors import NotFoundError
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-@router.post("/login", status_code=status.HTTP_200_OK)
+@router.post(
+    "/login",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(RateLimit("login", settings.rate_limit.login))],
+)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Authenticate user"""
 
     # Get user from the database by email in place of username
-    user = await UsersRepository().get(key_="email", value_=form_data.username)
+    user = await UsersRepository().get_public(
+        key_="email", value_=form_data.username
+    )
 
     if not user:
         raise NotFoundError
@@ -0,0 +1,31 @@
+"""src/presentation/rest/health.py"""
+
+from fastapi import APIRouter
+from fastapi import Response as HTTPResponse
+from fastapi import status
+
+from src.application import health
+from src.infrastructure.models import Response
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live", status_code=status.HTTP_200_OK)
+async def liveness() -> dict[str, str]:
+    """The process is able to handle requests"""
+
+    return {"status": "ok"}
+
+
+@router.get("/ready", status_code=status.HTTP_200_OK)
+async def readiness(
+    response: HTTPResponse,
+) -> Response[health.ReadinessPublic]:
+    """The worker is warmed up and its dependencies are reachable"""
+
+    result = await health.readiness()
+
+    if not result.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return Response[health.ReadinessPublic](result=result)
@@ -2,37 +2,49 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 
+from src.application import orders as orders_service
 from src.application.authentication import RoleRequired, get_current_user
-from src.celery.tasks import send_email
+from src.application.rate_limiting import RateLimit
+from src.application.unit_of_work import UnitOfWork, get_unit_of_work
+from src.config import settings
 from src.domain.constants import OrderStatus
 from src.domain.orders import (
+    CartSummaryPublic,
     Order,
     OrderCreateRequestBody,
     OrderPublic,
     OrdersRepository,
     OrderUncommited,
+    OrderWithProductPublic,
 )
-from src.domain.products import Product, ProductRepository
-from src.domain.users import User
+from src.domain.users import UserIdentity
+from src.infrastructure.database import timeout
+from src.infrastructure.database.idempotency import idempotent
 from src.infrastructure.database.transaction import transaction
 from src.infrastructure.models import Response, ResponseMulti
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+orders_rate_limit = Depends(RateLimit("orders", settings.rate_limit.orders))
 
-@router.post("/add_to_cart", status_code=status.HTTP_201_CREATED)
+
+@router.post(
+    "/add_to_cart",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[orders_rate_limit],
+)
 @transaction
+@idempotent("orders.add_to_cart", status_code=status.HTTP_201_CREATED)
 async def cart_create(
     _: Request,
     schema: OrderCreateRequestBody,
-    user: User = Depends(get_current_user),
+    user: UserIdentity = Depends(get_current_user),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ) -> Response[OrderPublic]:
     """Add product to cart"""
 
     # Get the product from database to check product`s amount
-    product = await ProductRepository().get(
-        key_="id", value_=schema.product_id
-    )
+    product = await uow.products.get(key_="id", value_=schema.product_id)
     if product.amount < schema.amount:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,15 +55,16 @@ async def cart_create(
         )
 
     # Create new order with 'PENDING' status
+    user_public = await uow.users.get_public(key_="id", value_=user.id)
     order_raw = OrderUncommited(
         product_id=schema.product_id,
         amount=schema.amount,
         user_id=user.id,
-        delivery_address=user.address,
+        delivery_address=user_public.address,
     )
 
     # Add order to the database like in cart
-    order: Order = await OrdersRepository().create(schema=order_raw)
+    order: Order = await uow.orders.create(schema=order_raw)
     order_public = OrderPublic.from_orm(order)
 
     return Response[OrderPublic](result=order_public)
@@ -63,13 +76,13 @@ async def cart_list(
     _: Request,
     skip: int = 0,
     limit: int | None = None,
-    user: User = Depends(get_current_user),  # pylint: disable=W0613
+    user: UserIdentity = Depends(get_current_user),  # pylint: disable=W0613
 ) -> ResponseMulti[OrderPublic]:
     """Get all orders from my cart."""
 
     # Get all user`s products with 'PENDING' status from the database
     orders_public = [
-        OrderPublic.from_orm(order)
+        order
         async for order in OrdersRepository().all_pending(
             value_=user.id, skip_=skip, limit_=limit
         )
@@ -78,18 +91,75 @@ async def cart_list(
     return ResponseMulti[OrderPublic](result=orders_public)
 
 
+@router.get("/my_cart/products", status_code=status.HTTP_200_OK)
+@transaction
+async def cart_list_with_products(
+    _: Request,
+    skip: int = 0,
+    limit: int | None = None,
+    user: UserIdentity = Depends(get_current_user),  # pylint: disable=W0613
+) -> ResponseMulti[OrderWithProductPublic]:
+    """Get all orders from my cart with the products names and prices."""
+
+    # Get all user`s orders with 'PENDING' status joined with products
+    orders_public = [
+        order
+        async for order in OrdersRepository().all_pending_with_products(
+            value_=user.id, skip_=skip, limit_=limit
+        )
+    ]
+
+    return ResponseMulti[OrderWithProductPublic](result=orders_public)
+
+
+@router.get("/my_cart/summary", status_code=status.HTTP_200_OK)
+@transaction
+async def cart_summary(
+    _: Request,
+    user: UserIdentity = Depends(get_current_user),  # pylint: disable=W0613
+) -> Response[CartSummaryPublic]:
+    """Get my cart lines with the totals."""
+
+    # Compute the cart totals within the database
+    summary = await OrdersRepository().cart_summary(value_=user.id)
+
+    return Response[CartSummaryPublic](result=summary)
+
+
+@router.get("/my_history", status_code=status.HTTP_200_OK)
+@transaction
+async def orders_history(
+    _: Request,
+    archived: bool = False,
+    skip: int = 0,
+    limit: int | None = None,
+    user: UserIdentity = Depends(get_current_user),  # pylint: disable=W0613
+) -> ResponseMulti[OrderPublic]:
+    """Get all my orders, the archived ones are included on demand."""
+
+    orders_public = [
+        order
+        async for order in OrdersRepository().history(
+            value_=user.id, archived_=archived, skip_=skip, limit_=limit
+        )
+    ]
+
+    return ResponseMulti[OrderPublic](result=orders_public)
+
+
 @router.put("/my_cart", status_code=status.HTTP_202_ACCEPTED)
 @transaction
 async def cart_amount_update(
     _: Request,
     order_id: int,
     new_amount: int,
-    user: User = Depends(get_current_user),  # pylint: disable=W0613
+    user: UserIdentity = Depends(get_current_user),  # pylint: disable=W0613
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ) -> Response[OrderPublic]:
     """Update product amount"""
 
     # Get the order from database
-    order = await OrdersRepository().get(key_="id", value_=order_id)
+    order = await uow.orders.get(key_="id", value_=order_id)
 
     # Check the status of the order
     if order.status != "PENDING":
@@ -100,7 +170,7 @@ async def cart_amount_update(
 
     # Update products amount
     payload = {"amount": new_amount}
-    product: Order = await OrdersRepository().update(
+    product: Order = await uow.orders.update(
         key_="id", value_=order_id, payload_=payload
     )
     product_public = OrderPublic.from_orm(product)
@@ -113,12 +183,13 @@ async def cart_amount_update(
 async def cart_remove(
     _: Request,
     order_id: int,
-    user: User = Depends(get_current_user),  # pylint: disable=W0613
+    user: UserIdentity = Depends(get_current_user),  # pylint: disable=W0613
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
     """Delete unpayed order from cart"""
 
     # Get the product from database to check product`s status
-    order = await OrdersRepository().get(key_="id", value_=order_id)
+    order = await uow.orders.get(key_="id", value_=order_id)
     if order.status != "PENDING":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -126,70 +197,103 @@ async def cart_remove(
         )
 
     # Delete order from database
-    await OrdersRepository().delete(id_=order_id)
+    await uow.orders.delete(id_=order_id)
 
     return HTTPException(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.put("/pay_my_cart", status_code=status.HTTP_202_ACCEPTED)
+@router.put(
+    "/pay_my_cart",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[orders_rate_limit],
+)
+@timeout(settings.timeouts.orders_pay)
 @transaction
+@idempotent("orders.pay_my_cart", status_code=status.HTTP_202_ACCEPTED)
 async def order_pay(
     _: Request,
     skip: int = 0,
     limit: int | None = None,
-    user: User = Depends(get_current_user),
+    user: UserIdentity = Depends(get_current_user),
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ):
     """Pay products from cart"""
 
     # Creating products list from orders with status PENDING
     product_list = [
-        Order.from_orm(order)
-        async for order in OrdersRepository().all_pending(
+        order
+        async for order in uow.orders.all_pending(
             value_=user.id, skip_=skip, limit_=limit
         )
     ]
 
-    # Update products amount in products database table
+    # Take the ordered products from the stock, the orders are cut
+    # to the taken amount if there are not enough of them
+    ordered: dict[int, int] = {}
     for order in product_list:
-        product: Product = await ProductRepository().get(
-            key_="id", value_=order.product_id
+        ordered[order.product_id] = (
+            ordered.get(order.product_id, 0) + order.amount
         )
-        if product.amount >= order.amount:
-            product.amount -= order.amount
-            await ProductRepository().update(
-                key_="id",
-                value_=product.id,
-                payload_={"amount": product.amount},
-            )
-        else:
-            order.amount = product.amount
-            product.amount = 0
-            await OrdersRepository().update(
-                key_="id", value_=order.id, payload_={"amount": order.amount}
-            )
-            await ProductRepository().update(
-                key_="id",
-                value_=product.id,
-                payload_={"amount": product.amount},
-            )
-        # Update order status
-        await OrdersRepository().update(
-            key_="id", value_=order.id, payload_={"status": OrderStatus.PAID}
+
+    taken, prices = await uow.products.take(ordered)
+
+    paid_list: list[OrderPublic] = []
+    paid: list[dict] = []
+    for order in product_list:
+        if not (amount := min(order.amount, taken[order.product_id])):
+            # Nothing is left, the order stays in the cart
+            continue
+
+        taken[order.product_id] -= amount
+        paid_list.append(order)
+        # The price is stored with the order to keep the revenue stable
+        paid.append(
+            {
+                "id": order.id,
+                "amount": amount,
+                "price": prices[order.product_id],
+                "status": OrderStatus.PAID,
+            }
         )
 
-    # Add updated orders id to list
-    orders_id = [order.id for order in product_list]
+    # The orders that are changed in between, e.g. cancelled
+    # or expired, are not paid and their products are put back
+    updated = set(
+        await uow.orders.update_many(
+            paid,
+            from_=OrderStatus.PENDING,
+            versions_={order.id: order.version for order in paid_list},
+        )
+    )
 
-    # Get updated orders
-    updated_orders = []
-    for order_id in orders_id:
-        order: Order = await OrdersRepository().get(key_="id", value_=order_id)
-        updated_orders.append(order)
+    put_back: dict[int, int] = {}
+    orders_public: list[OrderPublic] = []
+    for order, payload in zip(paid_list, paid):
+        if order.id not in updated:
+            put_back[order.product_id] = (
+                put_back.get(order.product_id, 0) + payload["amount"]
+            )
+            continue
+
+        orders_public.append(
+            order.copy(
+                update={
+                    "amount": payload["amount"],
+                    "status": OrderStatus.PAID.value,
+                    "version": order.version + 1,
+                }
+            )
+        )
 
-    orders_public = [OrderPublic.from_orm(order) for order in updated_orders]
+    await uow.products.put_back(put_back)
 
-    subject = "Goods paid"
-    send_email(user_=user, subject_=subject, orders_=orders_public)
+    if orders_public:
+        subject = "Goods paid"
+        await orders_service.notify(
+            user=await uow.users.get_public(key_="id", value_=user.id),
+            subject=subject,
+            orders=orders_public,
+        )
 
     return ResponseMulti[OrderPublic](result=orders_public)
 
@@ -200,13 +304,13 @@ async def orders_get(
     _: Request,
     skip: int = 0,
     limit: int | None = None,
-    user: User = Depends(RoleRequired(True)),  # pylint: disable=W0613
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
 ) -> ResponseMulti[OrderPublic]:
     """Get all payed orders, only manager"""
 
     # Get orders list with status PAID
     paid_orders_list = [
-        OrderPublic.from_orm(order)
+        order
         async for order in OrdersRepository().all_paid(
             value_=None, skip_=skip, limit_=limit
         )
@@ -216,43 +320,97 @@ async def orders_get(
 
 
 @router.put("/paid/shipped", status_code=status.HTTP_202_ACCEPTED)
+@timeout(settings.timeouts.orders_shipped)
 @transaction
 async def orders_shipped(
     _: Request,
     user_id: int,
     skip: int = 0,
     limit: int | None = None,
-    user: User = Depends(RoleRequired(True)),  # pylint: disable=W0613
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
+    uow: UnitOfWork = Depends(get_unit_of_work),
 ) -> ResponseMulti[OrderPublic]:
     """Update orders status to SHIPPED, only manager"""
 
     # Get orders list with status PAID, to current user
     paid_orders_list = [
-        OrderPublic.from_orm(order)
-        async for order in OrdersRepository().all_paid(
+        order
+        async for order in uow.orders.all_paid(
             value_=user_id, skip_=skip, limit_=limit
         )
     ]
 
-    # Update orders status to SHIPPED
-    payload = {"status": OrderStatus.SHIPPED}
-    for paid_order in paid_orders_list:
-        order: Order = await OrdersRepository().update(
-            key_="id", value_=paid_order.id, payload_=payload
+    # Update orders status to SHIPPED by one batch statement,
+    # the orders that are changed in between, e.g. cancelled, are skipped
+    updated = set(
+        await uow.orders.update_many(
+            [
+                {"id": order.id, "status": OrderStatus.SHIPPED}
+                for order in paid_orders_list
+            ],
+            from_=OrderStatus.PAID,
+            versions_={order.id: order.version for order in paid_orders_list},
+        )
+    )
+
+    orders_public = [
+        order.copy(
+            update={
+                "status": OrderStatus.SHIPPED.value,
+                "version": order.version + 1,
+            }
+        )
+        for order in paid_orders_list
+        if order.id in updated
+    ]
+
+    if orders_public:
+        subject = "Goods shipped"
+        await orders_service.notify(
+            user=await uow.users.get_public(key_="id", value_=user.id),
+            subject=subject,
+            orders=orders_public,
         )
 
-    # Add updated orders id to list
-    orders_id = [order.id for order in paid_orders_list]
+    return ResponseMulti[OrderPublic](result=orders_public)
 
-    # Get updated orders
-    updated_orders = []
-    for order_id in orders_id:
-        order: Order = await OrdersRepository().get(key_="id", value_=order_id)
-        updated_orders.append(order)
 
-    orders_public = [OrderPublic.from_orm(order) for order in updated_orders]
+@router.put("/delivered", status_code=status.HTTP_202_ACCEPTED)
+@transaction
+async def order_delivered(
+    _: Request,
+    order_id: int,
+    version: int | None = None,
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
+) -> Response[OrderPublic]:
+    """Update the shipped order status to DELIVERED, only manager"""
+
+    order: Order = await OrdersRepository().deliver(
+        id_=order_id, version_=version
+    )
 
-    subject = "Goods shipped"
-    send_email(user_=user, subject_=subject, orders_=orders_public)
+    return Response[OrderPublic](result=OrderPublic.from_orm(order))
 
-    return ResponseMulti[OrderPublic](result=orders_public)
+
+@router.put(
+    "/cancel",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[orders_rate_limit],
+)
+@transaction
+async def order_cancel(
+    _: Request,
+    order_id: int,
+    version: int | None = None,
+    user: UserIdentity = Depends(get_current_user),
+) -> Response[OrderPublic]:
+    """Cancel the pending or paid order. Managers can cancel any order,
+    customers only their own ones. Paid products return to the stock."""
+
+    order: Order = await OrdersRepository().cancel(
+        id_=order_id,
+        version_=version,
+        user_id_=None if user.is_manager else user.id,
+    )
+
+    return Response[OrderPublic](result=OrderPublic.from_orm(order))
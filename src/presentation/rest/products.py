@@ -1,8 +1,12 @@
 """src/presentation/rest/products.py"""
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import Response as HTTPResponse
+from fastapi import status
 
 from src.application.authentication import RoleRequired
+from src.config import settings
+from src.domain.constants import ProductsSorting
 from src.domain.products import (
     Product,
     ProductCreateRequestBody,
@@ -10,9 +14,19 @@ from src.domain.products import (
     ProductRepository,
     ProductUncommited,
 )
-from src.domain.users import User
+from src.domain.users import UserIdentity
 from src.infrastructure.database.transaction import transaction
-from src.infrastructure.models import Response, ResponseMulti
+from src.infrastructure.http import (
+    cache_headers,
+    is_not_modified,
+    make_etag,
+    not_modified,
+)
+from src.infrastructure.models import (
+    Response,
+    ResponseCursor,
+    ResponseMulti,
+)
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
@@ -20,42 +34,124 @@ router = APIRouter(prefix="/products", tags=["Products"])
 @router.get("/id/{product_id}", status_code=status.HTTP_200_OK)
 @transaction
 async def product_by_id(
-    _: Request, product_id: int
+    request: Request, response: HTTPResponse, product_id: int
 ) -> Response[ProductPublic]:
     """Get product by product id from database"""
 
+    # Check the product version before loading it
+    _, version = await ProductRepository().get_version(
+        key_="id", value_=product_id
+    )
+    etag = make_etag("product", product_id, version)
+    if is_not_modified(request, etag):
+        return not_modified(etag, settings.cache.products_max_age)
+
     # Get product from database by id
-    product: Product = await ProductRepository().get(
+    product: Product = await ProductRepository().get_shared(
         key_="id", value_=product_id
     )
     product_public = ProductPublic.from_orm(product)
 
+    response.headers.update(
+        cache_headers(
+            make_etag("product", product.id, product.version),
+            settings.cache.products_max_age,
+        )
+    )
+
     return Response[ProductPublic](result=product_public)
 
 
 @router.get("/name/{name}", status_code=status.HTTP_200_OK)
 @transaction
-async def product_by_name(_: Request, name: str) -> Response[ProductPublic]:
+async def product_by_name(
+    request: Request, response: HTTPResponse, name: str
+) -> Response[ProductPublic]:
     """Get product by product name from database"""
 
+    # Check the product version before loading it
+    product_id, version = await ProductRepository().get_version(
+        key_="name", value_=name
+    )
+    etag = make_etag("product", product_id, version)
+    if is_not_modified(request, etag):
+        return not_modified(etag, settings.cache.products_max_age)
+
     # Get product from database by name
-    product: Product = await ProductRepository().get(key_="name", value_=name)
+    product: Product = await ProductRepository().get_shared(
+        key_="name", value_=name
+    )
     product_public = ProductPublic.from_orm(product)
 
+    response.headers.update(
+        cache_headers(
+            make_etag("product", product.id, product.version),
+            settings.cache.products_max_age,
+        )
+    )
+
     return Response[ProductPublic](result=product_public)
 
 
 @router.get("/all", status_code=status.HTTP_200_OK)
 @transaction
 async def products_list(
-    _: Request, skip: int = 0, limit: int = None
+    request: Request,
+    response: HTTPResponse,
+    skip: int = 0,
+    limit: int = None,
+    min_price: int | None = None,
+    max_price: int | None = None,
+    in_stock: bool = False,
+    name_prefix: str | None = None,
+    sort: ProductsSorting = ProductsSorting.ID,
+    cursor: str | None = None,
+) -> ResponseCursor[ProductPublic]:
+    """Get all products from DB, filtered and sorted.
+    Pass the returned cursor to get the next page."""
+
+    # Get filtered products page from the database
+    products_public, next_cursor = await ProductRepository().filtered(
+        min_price_=min_price,
+        max_price_=max_price,
+        in_stock_=in_stock,
+        name_prefix_=name_prefix,
+        sort_=sort,
+        cursor_=cursor,
+        skip_=skip,
+        limit_=limit,
+    )
+
+    # The page ETag depends on the query and the products versions
+    etag = make_etag(
+        str(request.query_params),
+        [(product.id, product.version) for product in products_public],
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag, settings.cache.products_max_age)
+
+    response.headers.update(
+        cache_headers(etag, settings.cache.products_max_age)
+    )
+
+    return ResponseCursor[ProductPublic](
+        result=products_public, cursor=next_cursor
+    )
+
+
+@router.get("/search", status_code=status.HTTP_200_OK)
+@transaction
+async def products_search(
+    _: Request, q: str, skip: int = 0, limit: int | None = None
 ) -> ResponseMulti[ProductPublic]:
-    """Get all products from DB"""
+    """Search products by name and title"""
 
-    # Get all products from the database
+    # Get the matched products ordered by rank
     products_public = [
-        ProductPublic.from_orm(product)
-        async for product in ProductRepository().all(skip_=skip, limit_=limit)
+        product
+        async for product in ProductRepository().search(
+            query_=q, skip_=skip, limit_=limit
+        )
     ]
 
     return ResponseMulti[ProductPublic](result=products_public)
@@ -66,7 +162,7 @@ async def products_list(
 async def product_create(
     _: Request,
     product: ProductCreateRequestBody,
-    user: User = Depends(RoleRequired(True)),  # pylint: disable=W0613
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
 ) -> Response[ProductPublic]:
     """Create a new product, only managers"""
 
@@ -85,7 +181,7 @@ async def product_name_update(
     _: Request,
     product_id: int,
     new_name: str,
-    user: User = Depends(RoleRequired(True)),  # pylint: disable=W0613
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
 ) -> Response[ProductPublic]:
     """Update product name, only managers"""
 
@@ -105,7 +201,7 @@ async def product_title_update(
     _: Request,
     product_id: int,
     new_title: str,
-    user: User = Depends(RoleRequired(True)),  # pylint: disable=W0613
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
 ) -> Response[ProductPublic]:
     """Update product title, only managers"""
 
@@ -125,7 +221,7 @@ async def product_price_update(
     _: Request,
     product_id: int,
     new_price: int,
-    user: User = Depends(RoleRequired(True)),  # pylint: disable=W0613
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
 ) -> Response[ProductPublic]:
     """Update product price, only managers"""
 
@@ -145,7 +241,7 @@ async def product_amount_update(
     _: Request,
     product_id: int,
     new_amount: int,
-    user: User = Depends(RoleRequired(True)),  # pylint: disable=W0613
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
 ) -> Response[ProductPublic]:
     """Update product amount, only managers"""
 
@@ -164,7 +260,7 @@ async def product_amount_update(
 async def product_remove(
     _: Request,
     product_id: int,
-    user: User = Depends(RoleRequired(True)),  # pylint: disable=W0613
+    user: UserIdentity = Depends(RoleRequired(True)),  # pylint: disable=W0613
 ):
     """Delete product from database, only managers"""
 
@@ -3,10 +3,12 @@
 from fastapi import APIRouter, Depends, Request, status
 
 from src.application.authentication import RoleRequired, get_current_user
-from src.config import pwd_context
+from src.application.rate_limiting import RateLimit
+from src.config import get_pwd_context, settings
 from src.domain.users import (
     User,
     UserCreateRequestBody,
+    UserIdentity,
     UserPublic,
     UsersRepository,
     UserUncommited,
@@ -17,7 +19,13 @@ from src.infrastructure.models import Response, ResponseMulti
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-@router.post("/create", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/create",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[
+        Depends(RateLimit("users_create", settings.rate_limit.users_create))
+    ],
+)
 @transaction
 async def user_create(
     _: Request,
@@ -26,7 +34,7 @@ async def user_create(
     """Create new user."""
 
     # Password hashing
-    hashed_password = pwd_context.hash(schema.password)
+    hashed_password = get_pwd_context().hash(schema.password)
     schema.password = hashed_password
 
     # Save new user to the database
@@ -41,13 +49,14 @@ async def user_create(
 @router.get("/me", status_code=status.HTTP_200_OK)
 @transaction
 async def user_me(
-    current_user: User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_user),
 ) -> Response[UserPublic]:
     """Get current aythenticate user by JWT token"""
 
     # Get user by JWT from database
-    user: User = await UsersRepository().get(key_="id", value_=current_user.id)
-    user_public = UserPublic.from_orm(user)
+    user_public: UserPublic = await UsersRepository().get_public(
+        key_="id", value_=current_user.id
+    )
 
     return Response[UserPublic](result=user_public)
 
@@ -55,7 +64,7 @@ async def user_me(
 @router.get("/list", status_code=status.HTTP_200_OK)
 @transaction
 async def users_all(
-    _: User = Depends(RoleRequired(True)),
+    _: UserIdentity = Depends(RoleRequired(True)),
     skip: int = None,
     limit: int = None,
 ) -> ResponseMulti[UserPublic]:
@@ -63,8 +72,10 @@ async def users_all(
 
     # Get users list from database
     users_list = [
-        UserPublic.from_orm(users)
-        async for users in UsersRepository().all(skip_=skip, limit_=limit)
+        user
+        async for user in UsersRepository().all_public(
+            skip_=skip, limit_=limit
+        )
     ]
 
     return ResponseMulti[UserPublic](result=users_list)
@@ -73,15 +84,16 @@ async def users_all(
 @router.put("/manager", status_code=status.HTTP_202_ACCEPTED)
 @transaction
 async def user_manager(
-    user: UserPublic = Depends(get_current_user),
+    user: UserIdentity = Depends(get_current_user),
 ) -> Response[UserPublic]:
     """Update user to user-manager"""
 
     # Update user to user-manager
-    user.is_manager = True
-    user: User = await UsersRepository().update(
-        key_="id", value_=user.id, payload_=user
+    instance: User = await UsersRepository().get(key_="id", value_=user.id)
+    instance.is_manager = True
+    instance = await UsersRepository().update(
+        key_="id", value_=user.id, payload_=instance
     )
-    manager = UserPublic.from_orm(user)
+    manager = UserPublic.from_orm(instance)
 
     return Response[UserPublic](result=manager)
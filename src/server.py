@@ -0,0 +1,79 @@
+"""src/server.py"""
+
+# This module is the production entry point: python -m src.server
+# Gunicorn manages the uvicorn worker processes that are configured
+# by the `settings.server`. The application is imported by every worker
+# after the fork and the database engine is created per process,
+# so the database connections are never shared.
+
+import asyncio
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from src.config import settings
+from src.infrastructure import database
+
+
+class Worker(UvicornWorker):
+    """Uvicorn worker with the event loop and HTTP parser from settings."""
+
+    CONFIG_KWARGS = {
+        "loop": settings.server.loop,
+        "http": settings.server.http,
+    }
+
+
+def on_starting(_server) -> None:
+    """Create tables once in the master process,
+    so the workers do not race for it on startup."""
+
+    async def create_tables():
+        await database.create_tables()
+        await database.dispose_engine()
+
+    asyncio.run(create_tables())
+
+
+class Server(BaseApplication):
+    """Gunicorn application that is configured without the config file."""
+
+    def __init__(self, options: dict) -> None:
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # The tables are created by the on_starting hook already
+        settings.database.create_tables = False
+
+        from src.main import app
+
+        return app
+
+
+def run() -> None:
+    server = settings.server
+
+    Server(
+        {
+            "bind": f"{server.host}:{server.port}",
+            "workers": server.workers,
+            "worker_class": "src.server.Worker",
+            "backlog": server.backlog,
+            "keepalive": server.keepalive,
+            "timeout": server.timeout,
+            "graceful_timeout": server.graceful_timeout,
+            "max_requests": server.max_requests,
+            "max_requests_jitter": server.max_requests_jitter,
+            "preload_app": False,
+            "on_starting": on_starting,
+        }
+    ).run()
+
+
+if __name__ == "__main__":
+    run()
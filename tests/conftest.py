@@ -0,0 +1,92 @@
+import asyncio
+import os
+import tempfile
+from itertools import count
+
+import httpx
+import pytest
+
+# The database file is created in the current working directory,
+# so the tests use the temporary one instead of the local database
+os.chdir(tempfile.mkdtemp())
+
+from src.config import settings  # noqa: E402
+from src.infrastructure import database  # noqa: E402
+from src.main import app  # noqa: E402
+
+settings.rate_limit.enabled = False
+
+# The tests share the database, so the names are unique
+_names = count()
+
+
+@pytest.fixture
+def run():
+    """Run the scenario with the client against the test database."""
+
+    def runner(scenario):
+        async def main():
+            await database.create_tables()
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://test",
+            ) as client:
+                return await scenario(client)
+
+        return asyncio.run(main())
+
+    return runner
+
+
+@pytest.fixture
+def login():
+    """Create the new manager and return the id and the headers."""
+
+    async def create(client: httpx.AsyncClient) -> tuple[int, dict]:
+        email = f"user{next(_names)}@example.com"
+        response = await client.post(
+            "/users/create",
+            json={
+                "email": email,
+                "first_name": "John",
+                "last_name": "Doe",
+                "phone_number": "1",
+                "address": "Street 1",
+                "password": "password",
+            },
+        )
+        user_id = response.json()["result"]["id"]
+
+        response = await client.post(
+            "/auth/login", data={"username": email, "password": "password"}
+        )
+        token = response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        await client.put("/users/manager", headers=headers)
+
+        return user_id, headers
+
+    return create
+
+
+@pytest.fixture
+def product():
+    """Create the new product and return its id."""
+
+    async def create(
+        client: httpx.AsyncClient, headers: dict, amount: int = 5
+    ) -> int:
+        response = await client.post(
+            "/products/add",
+            headers=headers,
+            json={
+                "name": f"shoe{next(_names)}",
+                "title": "Red shoe",
+                "price": 10,
+                "amount": amount,
+            },
+        )
+        return response.json()["result"]["id"]
+
+    return create
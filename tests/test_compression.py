@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.config import CompressionSettings
+from src.infrastructure.http import CompressionMiddleware
+
+_ETAG = '"abc"'
+
+
+async def _products(request):
+    size = int(request.query_params["size"])
+    return JSONResponse({"data": "x" * size}, headers={"ETag": _ETAG})
+
+
+def _get(size: int, encoding: str = "gzip") -> httpx.Response:
+    app = CompressionMiddleware(
+        Starlette(routes=[Route("/", _products)]),
+        **CompressionSettings().dict(exclude={"enabled"}),
+    )
+
+    async def main():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            return await client.get(
+                "/",
+                params={"size": size},
+                headers={"Accept-Encoding": encoding},
+            )
+
+    return asyncio.run(main())
+
+
+def test_compressed_etag_is_weak():
+    response = _get(4096)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == f"W/{_ETAG}"
+    assert response.json() == {"data": "x" * 4096}
+
+
+def test_small_response_is_not_compressed():
+    response = _get(100)
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == _ETAG
+
+
+def test_minimum_size_default():
+    middleware = CompressionMiddleware(Starlette())
+
+    assert middleware.minimum_size == CompressionSettings().minimum_size
@@ -0,0 +1,37 @@
+import asyncio
+
+from src.application.health import health
+from src.config import settings
+from src.infrastructure import database
+
+
+def test_failed_warmup_is_retried(monkeypatch):
+    attempts: list[int] = []
+
+    async def hot_queries():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise ConnectionError("The database is not available")
+
+    monkeypatch.setattr(health, "_run_hot_queries", hot_queries)
+    monkeypatch.setattr(health._State, "warm", False)
+    monkeypatch.setattr(health._State, "error", None)
+    monkeypatch.setattr(settings.health, "warmup_retry_delay", 0.1)
+    monkeypatch.setattr(settings.health, "check_broker", False)
+
+    async def scenario():
+        await database.create_tables()
+
+        warmup = asyncio.create_task(health.warmup())
+        await asyncio.sleep(0.05)
+        failed = await health.readiness()
+        await warmup
+
+        return failed, await health.readiness()
+
+    failed, ready = asyncio.run(scenario())
+
+    assert not failed.ready
+    assert "ConnectionError" in failed.checks[0].error
+    assert ready.ready
+    assert len(attempts) == 2
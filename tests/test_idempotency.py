@@ -0,0 +1,117 @@
+import json
+
+from starlette.requests import Request
+
+from src.config import settings
+from src.infrastructure.database.idempotency import (
+    IdempotencyKeysRepository,
+    _fingerprint,
+)
+from src.infrastructure.database.transaction import transaction
+
+
+async def _add_to_cart(client, headers, key, product_id, amount):
+    return await client.post(
+        "/orders/add_to_cart",
+        headers={**headers, "Idempotency-Key": key},
+        content=json.dumps({"product_id": product_id, "amount": amount}),
+    )
+
+
+async def _cart(client, headers) -> list[dict]:
+    response = await client.get("/orders/my_cart", headers=headers)
+    return response.json()["result"]
+
+
+def test_replay(run, login, product):
+    async def scenario(client):
+        _, headers = await login(client)
+        product_id = await product(client, headers)
+
+        first = await _add_to_cart(client, headers, "key", product_id, 2)
+        replay = await _add_to_cart(client, headers, "key", product_id, 2)
+
+        return first, replay, await _cart(client, headers)
+
+    first, replay, cart = run(scenario)
+
+    assert first.status_code == 201
+    assert replay.status_code == 201
+    assert replay.json() == first.json()
+    assert len(cart) == 1
+
+
+def test_key_reused_for_another_request(run, login, product):
+    async def scenario(client):
+        _, headers = await login(client)
+        product_id = await product(client, headers)
+
+        await _add_to_cart(client, headers, "key", product_id, 2)
+        response = await _add_to_cart(client, headers, "key", product_id, 3)
+
+        return response, await _cart(client, headers)
+
+    response, cart = run(scenario)
+
+    assert response.status_code == 422
+    assert len(cart) == 1
+
+
+def test_request_in_progress(run, login, product):
+    @transaction
+    async def claim(owner: int, body: bytes):
+        async def receive():
+            return {"type": "http.request", "body": body}
+
+        request = Request(
+            {
+                "type": "http",
+                "method": "POST",
+                "path": "/orders/add_to_cart",
+                "query_string": b"",
+                "headers": [],
+            },
+            receive,
+        )
+        await IdempotencyKeysRepository().claim(
+            "orders.add_to_cart",
+            str(owner),
+            "key",
+            await _fingerprint(request),
+        )
+
+    async def scenario(client):
+        user_id, headers = await login(client)
+        product_id = await product(client, headers)
+
+        # The same request is claimed, but is not completed yet
+        await claim(
+            user_id,
+            json.dumps({"product_id": product_id, "amount": 2}).encode(),
+        )
+        response = await _add_to_cart(client, headers, "key", product_id, 2)
+
+        return response, await _cart(client, headers)
+
+    response, cart = run(scenario)
+
+    assert response.status_code == 409
+    assert cart == []
+
+
+def test_expired_key_is_claimed_again(run, login, product, monkeypatch):
+    async def scenario(client):
+        _, headers = await login(client)
+        product_id = await product(client, headers)
+
+        await _add_to_cart(client, headers, "key", product_id, 2)
+        monkeypatch.setattr(settings.idempotency, "ttl", -1)
+        response = await _add_to_cart(client, headers, "key", product_id, 3)
+
+        return response, await _cart(client, headers)
+
+    response, cart = run(scenario)
+
+    assert response.status_code == 201
+    assert response.json()["result"]["amount"] == 3
+    assert len(cart) == 2
@@ -0,0 +1,49 @@
+import subprocess
+import sys
+from pathlib import Path
+
+# The modules that are imported only when they are used,
+# see the README for the profiling command
+DEFERRED = ("celery", "jose", "passlib")
+
+# The cumulative import time of the application, it is generous
+# to catch the heavy imports, not the slow machines
+BUDGET = 5.0  # seconds
+
+
+def _import_main() -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import sys, src.main; " "print(' '.join(sorted(sys.modules)))",
+        ],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _cumulative(importtime: str, module: str) -> float:
+    """Return the cumulative import time of the module in seconds."""
+
+    for line in importtime.splitlines():
+        _, _, timings = line.partition("import time:")
+        fields = [field.strip() for field in timings.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1_000_000
+
+    raise AssertionError(f"{module} is not imported")
+
+
+def test_cold_start():
+    process = _import_main()
+    modules = set(process.stdout.split())
+
+    assert not {
+        module for module in modules if module.split(".")[0] in DEFERRED
+    }
+    assert _cumulative(process.stderr, "src.main") < BUDGET
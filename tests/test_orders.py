@@ -0,0 +1,143 @@
+from src.domain.constants import OrderStatus
+from src.domain.orders import OrdersRepository
+from src.infrastructure.database.transaction import transaction
+
+
+@transaction
+async def _ship(ids: list[int], versions: dict[int, int] | None = None):
+    return await OrdersRepository().update_many(
+        [{"id": id_, "status": OrderStatus.SHIPPED} for id_ in ids],
+        from_=OrderStatus.PAID,
+        versions_=versions,
+    )
+
+
+async def _paid_orders(client, headers, product_id) -> list[dict]:
+    for amount in (1, 2):
+        await client.post(
+            "/orders/add_to_cart",
+            headers=headers,
+            json={"product_id": product_id, "amount": amount},
+        )
+    response = await client.put("/orders/pay_my_cart", headers=headers)
+
+    return response.json()["result"]
+
+
+async def _statuses(client, headers) -> dict[str, int]:
+    response = await client.get("/analytics/statuses", headers=headers)
+    return {
+        item["status"]: item["count"] for item in response.json()["result"]
+    }
+
+
+def test_update_many_skips_changed_orders(run, login, product):
+    async def scenario(client):
+        _, headers = await login(client)
+        product_id = await product(client, headers)
+        cancelled, paid = await _paid_orders(client, headers, product_id)
+
+        await client.put(
+            "/orders/cancel",
+            headers=headers,
+            params={"order_id": cancelled["id"]},
+        )
+        before = await _statuses(client, headers)
+        updated = await _ship([cancelled["id"], paid["id"]])
+        after = await _statuses(client, headers)
+
+        return paid, updated, before, after
+
+    paid, updated, before, after = run(scenario)
+
+    assert updated == [paid["id"]]
+    assert after["SHIPPED"] == before.get("SHIPPED", 0) + 1
+    assert after["PAID"] == before["PAID"] - 1
+    assert after["CANCELLED"] == before["CANCELLED"]
+
+
+def test_update_many_checks_versions(run, login, product):
+    async def scenario(client):
+        _, headers = await login(client)
+        product_id = await product(client, headers)
+        stale, current = await _paid_orders(client, headers, product_id)
+
+        return current, await _ship(
+            [stale["id"], current["id"]],
+            versions={
+                stale["id"]: stale["version"] - 1,
+                current["id"]: current["version"],
+            },
+        )
+
+    current, updated = run(scenario)
+
+    assert updated == [current["id"]]
+
+
+def _cancel_listed(monkeypatch, method: str) -> None:
+    """Cancel the first order right after it is listed by the route,
+    like a concurrent request does."""
+
+    listed = getattr(OrdersRepository, method)
+
+    async def wrapper(self, *args, **kwargs):
+        orders = [order async for order in listed(self, *args, **kwargs)]
+        await self.cancel(id_=orders[0].id)
+
+        for order in orders:
+            yield order
+
+    monkeypatch.setattr(OrdersRepository, method, wrapper)
+
+
+async def _amount(client, headers, product_id) -> int:
+    response = await client.get(f"/products/id/{product_id}", headers=headers)
+    return response.json()["result"]["amount"]
+
+
+def test_pay_skips_cancelled_order(run, login, product, monkeypatch):
+    async def scenario(client):
+        _, headers = await login(client)
+        product_id = await product(client, headers)
+        for amount in (1, 2):
+            await client.post(
+                "/orders/add_to_cart",
+                headers=headers,
+                json={"product_id": product_id, "amount": amount},
+            )
+
+        _cancel_listed(monkeypatch, "all_pending")
+        response = await client.put("/orders/pay_my_cart", headers=headers)
+
+        return response, await _amount(client, headers, product_id)
+
+    response, amount = run(scenario)
+
+    assert [order["amount"] for order in response.json()["result"]] == [2]
+    assert amount == 3
+
+
+def test_shipped_skips_cancelled_order(run, login, product, monkeypatch):
+    async def scenario(client):
+        user_id, headers = await login(client)
+        product_id = await product(client, headers)
+        await _paid_orders(client, headers, product_id)
+
+        _cancel_listed(monkeypatch, "all_paid")
+        response = await client.put(
+            "/orders/paid/shipped",
+            headers=headers,
+            params={"user_id": user_id},
+        )
+
+        return response, await _amount(client, headers, product_id)
+
+    response, amount = run(scenario)
+
+    assert [order["amount"] for order in response.json()["result"]] == [2]
+    assert [order["status"] for order in response.json()["result"]] == [
+        "SHIPPED"
+    ]
+    # The cancelled order products are returned to the stock once
+    assert amount == 3
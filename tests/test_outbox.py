@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+
+from src.config import settings
+from src.infrastructure import database
+from src.infrastructure.database import OutboxTable
+from src.infrastructure.database.outbox import OutboxRepository, relay
+from src.infrastructure.database.transaction import transaction
+
+
+@transaction
+async def _reset(messages: int) -> None:
+    repository = OutboxRepository()
+    await repository.execute(delete(OutboxTable))
+
+    for number in range(messages):
+        repository.add(topic_="test", payload_={"number": number})
+
+
+@transaction
+async def _messages() -> list[OutboxTable]:
+    result = await OutboxRepository().execute(
+        select(OutboxTable).order_by(OutboxTable.id)
+    )
+    return list(result.scalars().all())
+
+
+@transaction
+async def _age(**values) -> None:
+    await OutboxRepository().execute(update(OutboxTable).values(**values))
+
+
+def _run(scenario):
+    async def main():
+        await database.create_tables()
+        return await scenario()
+
+    return asyncio.run(main())
+
+
+def _broken(calls: list):
+    def dispatch(topic, payload):
+        calls.append(payload)
+        raise ConnectionError("The broker is not available")
+
+    return dispatch
+
+
+def test_relay_dispatches_messages():
+    async def scenario():
+        await _reset(3)
+        calls: list = []
+        total = await relay(
+            lambda topic, payload: calls.append(payload), batch_size=2
+        )
+
+        return total, calls, await _messages()
+
+    total, calls, messages = _run(scenario)
+
+    assert total == 3
+    assert calls == [{"number": 0}, {"number": 1}, {"number": 2}]
+    assert all(message.dispatched_at for message in messages)
+
+
+def test_relay_stops_on_failure_and_backs_off():
+    async def scenario():
+        await _reset(3)
+        calls: list = []
+        await relay(_broken(calls), batch_size=10)
+        first = list(calls)
+        # The failed message is not due yet, the next one is tried
+        await relay(_broken(calls), batch_size=10)
+
+        return first, calls, await _messages()
+
+    first, calls, messages = _run(scenario)
+
+    assert first == [{"number": 0}]
+    assert calls == [{"number": 0}, {"number": 1}]
+    assert [message.attempts for message in messages] == [1, 1, 0]
+    assert messages[0].next_attempt_at > datetime.utcnow() + timedelta(
+        seconds=settings.outbox.retry_delay - 5
+    )
+
+
+def test_exhausted_message_is_dropped_and_removed():
+    async def scenario():
+        await _reset(1)
+        await _age(attempts=settings.outbox.max_attempts - 1)
+        await relay(_broken([]), batch_size=10)
+
+        calls: list = []
+        await relay(_broken(calls), batch_size=10)
+        exhausted = await _messages()
+
+        await _age(
+            created_at=datetime.utcnow()
+            - timedelta(seconds=settings.outbox.retention + 1)
+        )
+        await relay(_broken(calls), batch_size=10)
+
+        return calls, exhausted, await _messages()
+
+    calls, exhausted, removed = _run(scenario)
+
+    assert calls == []
+    assert exhausted[0].attempts == settings.outbox.max_attempts
+    assert removed == []
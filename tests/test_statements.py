@@ -0,0 +1,96 @@
+from src.domain.products import ProductRepository
+from src.domain.users import UsersRepository
+from src.infrastructure.database import (
+    BaseRepository,
+    ProductsTable,
+    UsersTable,
+)
+from src.infrastructure.database.transaction import transaction
+
+
+@transaction
+async def _get(id_: int, columns: tuple[str, ...] | None = None) -> dict:
+    instance = await ProductRepository()._get(
+        key="id", value=id_, columns=columns
+    )
+    return {
+        column: getattr(instance, column) for column in columns or ("name",)
+    }
+
+
+@transaction
+async def _update(id_: int, amount: int) -> int:
+    instance = await ProductRepository()._update(
+        key="id", value=id_, payload={"amount": amount}, bump_version=True
+    )
+    return instance.amount
+
+
+@transaction
+async def _get_user(id_: int) -> str:
+    return (await UsersRepository()._get(key="id", value=id_)).email
+
+
+async def _name(client, id_: int) -> str:
+    response = await client.get(f"/products/id/{id_}")
+    return response.json()["result"]["name"]
+
+
+def test_cached_get_returns_the_requested_rows(run, login, product):
+    async def scenario(client):
+        _, headers = await login(client)
+        first = await product(client, headers, amount=1)
+        second = await product(client, headers, amount=2)
+
+        for id_ in (first, second, first):
+            assert await _get(id_) == {"name": await _name(client, id_)}
+
+        assert await _get(first, ("amount",)) == {"amount": 1}
+        assert await _get(second, ("amount",)) == {"amount": 2}
+        assert await _get(second, ("name", "price")) == {
+            "name": await _name(client, second),
+            "price": 10,
+        }
+
+    run(scenario)
+
+
+def test_cached_update_changes_the_requested_rows(run, login, product):
+    async def scenario(client):
+        _, headers = await login(client)
+        first = await product(client, headers, amount=1)
+        second = await product(client, headers, amount=2)
+
+        assert await _update(first, 10) == 10
+        assert await _update(second, 20) == 20
+
+        assert await _get(first, ("amount", "version")) == {
+            "amount": 10,
+            "version": 2,
+        }
+        assert await _get(second, ("amount", "version")) == {
+            "amount": 20,
+            "version": 2,
+        }
+
+    run(scenario)
+
+
+def test_statements_are_cached_per_schema_class(run, login, product):
+    async def scenario(client):
+        user_id, headers = await login(client)
+        product_id = await product(client, headers)
+
+        await _get(product_id)
+        assert "@" in await _get_user(user_id)
+
+        products = BaseRepository._statements[
+            (ProductsTable, ("get", "id", None))
+        ]
+        users = BaseRepository._statements[(UsersTable, ("get", "id", None))]
+
+        assert products is not users
+        assert products.column_descriptions[0]["entity"] is ProductsTable
+        assert users.column_descriptions[0]["entity"] is UsersTable
+
+    run(scenario)